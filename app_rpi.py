@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+import sys
 import time
+import threading
 import logging
+import functools
 from constants import *
 
 # 각 모듈을 불러올 때 발생할 수 있는 오류를 처리
@@ -14,6 +17,24 @@ except ImportError as e:
     print(f"필수 모듈을 불러오는 데 실패했습니다: {e}")
     exit()
 
+# mix_skid 결과 캐시: 조이스틱/키보드 입력은 소수점 2자리로 양자화하여
+# 같은 (속도, 조향) 입력이 반복될 때 계산 대신 캐시를 조회합니다.
+_mix_skid_cached = functools.lru_cache(maxsize=256)(mix_skid)
+
+# 입력 poll 간격 상한 (초). 기존 고정 sleep(10ms)과 같은 값이며,
+# 다음 모터 전송 시점이 더 가까우면 그때까지만 대기
+INPUT_POLL_INTERVAL_S = 0.01
+
+# 상태 출력 템플릿 (루프마다 포맷 문자열을 다시 만들지 않도록 미리 정의)
+_STATUS_FMT = "\rMode:{:<9} Speed:{:5.2f} Steer:{:5.2f} Servo:{:5.1f}"
+
+def _shape(v):
+    """
+    축 입력에 데드존과 0.01 단위 양자화를 적용합니다.
+    (정지 상태의 미세한 노이즈가 매번 다른 값으로 들어와 불필요한 전송을 유발하지 않도록)
+    """
+    return 0.0 if abs(v) < DEADZONE else round(v, 2)
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 log = logging.getLogger("app_rpi")
@@ -29,6 +50,35 @@ class RpiRobotApp:
         self.mode = MODE_JOYSTICK
         self.running = False
         self.hw_ok = False    # [수정 3A] 하드웨어 상태 플래그
+        self._last_servo_us = None  # 마지막으로 서보에 전송한 펄스 폭 (변경 시에만 전송)
+        self._input_dirty = True    # 입력 소스 변경 여부 (loop_hw가 poll 메서드를 다시 읽음)
+
+        # 정지 요청 신호: 다른 스레드(시그널 핸들러, 외부 킬스위치 등)에서 set 하면
+        # 주기 대기 중인 제어 루프가 즉시 깨어납니다.
+        self._stop_evt = threading.Event()
+
+        # 이벤트 처리 테이블 (if/elif 문자열 비교 대신 dict 조회로 분기)
+        self._type_dispatch = {
+            EVENT_SYS: self._on_sys,
+            EVENT_CMD: self._on_cmd,
+            EVENT_AXIS: self._on_axis,
+        }
+        self._sys_dispatch = {
+            ACTION_E_STOP: self._on_estop,
+            ACTION_SET_MODE: self._on_set_mode,
+        }
+        self._cmd_dispatch = {
+            ACTION_INC_SPEED: self._on_inc_speed,
+            ACTION_DEC_SPEED: self._on_dec_speed,
+            ACTION_STEER_LEFT: self._on_steer_left,
+            ACTION_STEER_RIGHT: self._on_steer_right,
+            ACTION_STOP: self._on_stop,
+        }
+
+        # 장치 핸들은 먼저 None으로 두어, 초기화 도중 실패해도 cleanup()이
+        # 생성된 장치만 안전하게 정리할 수 있도록 합니다.
+        self.keyboard = self.joystick = self.input_source = None
+        self.servo = self.motor = None
 
         try:
             # 입력 장치 초기화
@@ -52,50 +102,75 @@ class RpiRobotApp:
     def cleanup(self):
         """프로그램 종료 시 호출될 자원 정리 메서드"""
         log.info("프로그램을 종료합니다...")
-        if hasattr(self, 'motor'):
+        # 정리한 장치는 None으로 되돌려 cleanup()이 두 번 호출되어도 안전하게 함
+        if self.motor is not None:
             self.motor.stop()
-        if hasattr(self, 'servo'):
+            self.motor = None
+        if self.servo is not None:
             # [수정 3C] stop() 대신 cleanup()을 호출하여 pigpio 연결을 안전하게 종료
             self.servo.cleanup()
-        if hasattr(self, 'keyboard'):
+            self.servo = None
+        if self.keyboard is not None:
             self.keyboard.close()
+            self.keyboard = None
+
+    def request_stop(self):
+        """
+        제어 루프 정지를 요청합니다. (다른 스레드나 시그널 핸들러에서 호출 가능)
+        대기 중인 루프는 다음 주기를 기다리지 않고 즉시 깨어납니다.
+        """
+        self.running = False
+        self._stop_evt.set()
 
     def handle_event(self, event):
-        et = event.get("type")
-
-        if et == EVENT_SYS:
-            action = event.get("action")
-            if action == ACTION_E_STOP:
-                log.critical("!!! 비상 정지(E-STOP) !!!")
-                self.running = False # 루프 즉시 종료
-            elif action == ACTION_SET_MODE:
-                new_mode = event.get("mode")
-                if self.mode != new_mode:
-                    self.mode = new_mode
-                    log.info(f"모드 변경 -> {self.mode}")
-                    if self.mode == MODE_BUTTON:
-                        self.input_source = self.keyboard
-                    elif self.mode == MODE_JOYSTICK:
-                        self.input_source = self.joystick
-                        if not self.joystick.is_connected:
-                            log.warning("조이스틱이 연결되지 않았습니다.")
-                    else:
-                        self.input_source = None
-                        log.warning(f"{new_mode} 모드는 지원되지 않습니다.")
-        
-        elif et == EVENT_CMD: # 키보드 입력
-            action = event.get("action")
-            if action == ACTION_INC_SPEED: self.speed = min(1.0, self.speed + 0.1)
-            elif action == ACTION_DEC_SPEED: self.speed = max(-1.0, self.speed - 0.1)
-            elif action == ACTION_STEER_LEFT: self.steer = -1.0
-            elif action == ACTION_STEER_RIGHT: self.steer = 1.0
-            elif action == ACTION_STOP: self.speed, self.steer = 0.0, 0.0
-
-        elif et == EVENT_AXIS: # 조이스틱 입력
-            if self.mode == MODE_JOYSTICK:
-                self.speed = -event.get('y', 0.0) # [수정 3B] Y축 반전
-                self.steer = -event.get('x', 0.0)
-                self.rx = event.get('rx', 0.0)
+        handler = self._type_dispatch.get(event.get("type"))
+        if handler is not None:
+            handler(event)
+
+    # --- 이벤트 타입별 처리 ---
+    def _on_sys(self, event):
+        handler = self._sys_dispatch.get(event.get("action"))
+        if handler is not None:
+            handler(event)
+
+    def _on_cmd(self, event): # 키보드 입력
+        handler = self._cmd_dispatch.get(event.get("action"))
+        if handler is not None:
+            handler()
+
+    def _on_axis(self, event): # 조이스틱 입력
+        if self.mode == MODE_JOYSTICK:
+            self.speed = _shape(-event.get('y', 0.0)) # [수정 3B] Y축 반전
+            self.steer = _shape(-event.get('x', 0.0))
+            self.rx = _shape(event.get('rx', 0.0))
+
+    # --- 시스템 액션 ---
+    def _on_estop(self, event):
+        log.critical("!!! 비상 정지(E-STOP) !!!")
+        self.request_stop() # 루프 즉시 종료
+
+    def _on_set_mode(self, event):
+        new_mode = event.get("mode")
+        if self.mode != new_mode:
+            self.mode = new_mode
+            self._input_dirty = True
+            log.info(f"모드 변경 -> {self.mode}")
+            if self.mode == MODE_BUTTON:
+                self.input_source = self.keyboard
+            elif self.mode == MODE_JOYSTICK:
+                self.input_source = self.joystick
+                if not self.joystick.is_connected:
+                    log.warning("조이스틱이 연결되지 않았습니다.")
+            else:
+                self.input_source = None
+                log.warning(f"{new_mode} 모드는 지원되지 않습니다.")
+
+    # --- 명령 액션 ---
+    def _on_inc_speed(self): self.speed = min(1.0, self.speed + 0.1)
+    def _on_dec_speed(self): self.speed = max(-1.0, self.speed - 0.1)
+    def _on_steer_left(self): self.steer = -1.0
+    def _on_steer_right(self): self.steer = 1.0
+    def _on_stop(self): self.speed, self.steer = 0.0, 0.0
 
     def loop_hw(self):
         """메인 하드웨어 제어 루프"""
@@ -103,36 +178,74 @@ class RpiRobotApp:
             log.error("하드웨어 오류로 인해 메인 루프를 시작할 수 없습니다.")
             return
 
-        self.running = True
+        self.running = not self._stop_evt.is_set()
         period = 1.0 / max(1.0, CTRL_HZ)
-        last_send = 0.0
+        next_send = time.monotonic()  # 다음 모터 전송 시점 (monotonic 기준 deadline)
+        print_interval = 1.0 / STATUS_PRINT_HZ
+        last_print = 0.0
+
+        # 루프 안에서 반복 조회되는 메서드/상수를 지역 변수로 미리 꺼내 둠
+        # (self.xxx / 전역 조회 대신 지역 변수 접근으로 처리)
+        write_angle = self.servo.write_angle
+        angle_to_us = self.servo.angle_to_us
+        write_lr = self.motor.write_lr
+        mix = _mix_skid_cached
+        max_spd = MAX_MOTOR_SPEED
+        handle_event = self.handle_event
+        poll_interval = INPUT_POLL_INTERVAL_S
+        stop_evt = self._stop_evt
+        monotonic = time.monotonic
+        last_servo_us = self._last_servo_us
+        poll = None
 
         try:
             while self.running:
-                # [수정 2] 키보드 모드일 때 매번 조향 값을 초기화하여 'sticky' 문제 해결
-                if self.mode == MODE_BUTTON:
-                    self.steer = 0.0
-                
-                if self.input_source:
-                    for e in self.input_source.poll():
-                        self.handle_event(e)
+                # 입력 소스가 바뀐 경우에만 poll 메서드를 다시 조회
+                if self._input_dirty:
+                    source = self.input_source
+                    poll = source.poll if source else None
+                    self._input_dirty = False
+
+                # 대기 중인 입력 이벤트 처리
+                if poll is not None:
+                    for e in poll():
+                        handle_event(e)
                 
                 # 서보 즉시 반영: -1..1 -> 0..180
+                # 펄스 폭이 실제로 바뀐 경우에만 pigpio에 전송
                 servo_deg = 90.0 + self.rx * 80.0 # -1 -> 180, 0 -> 90, 1 -> 0
-                self.servo.write_angle(servo_deg)
+                servo_us = angle_to_us(servo_deg)
+                if servo_us != last_servo_us:
+                    write_angle(servo_deg)
+                    last_servo_us = self._last_servo_us = servo_us
 
                 # 모터는 설정된 주기로 전송 (I2C 부하 감소)
-                now = time.time()
-                if now - last_send >= period:
-                    l, r = mix_skid(self.speed, self.steer)
-                    l_i = int(l * MAX_MOTOR_SPEED)
-                    r_i = int(r * MAX_MOTOR_SPEED)
-                    self.motor.write_lr(l_i, r_i)
-                    last_send = now
-
-                # 현재 상태 출력
-                print(f"\rMode:{self.mode:<9} Speed:{self.speed:5.2f} Steer:{self.steer:5.2f} Servo:{servo_deg:5.1f}", end="")
-                time.sleep(0.01) # CPU 사용량 감소
+                now = monotonic()
+                if now >= next_send:
+                    l, r = mix(round(self.speed, 2), round(self.steer, 2))
+                    write_lr(int(l * max_spd), int(r * max_spd))
+
+                    # 전송 시각이 아닌 이전 deadline 기준으로 다음 시점을 잡아 drift 방지
+                    next_send += period
+                    if next_send < now:
+                        # 루프가 크게 지연된 경우 밀린 전송을 몰아서 하지 않음
+                        next_send = now + period
+
+                    # [수정 2] 키보드 모드일 때 전송 후 조향 값을 초기화하여 'sticky' 문제 해결
+                    # (반복 시작 시 초기화하면 입력 대기 중 전송 전에 조향 값이 사라짐)
+                    if self.mode == MODE_BUTTON:
+                        self.steer = 0.0
+
+                # 현재 상태 출력 (STATUS_PRINT_HZ로 제한)
+                if now - last_print >= print_interval:
+                    sys.stdout.write(_STATUS_FMT.format(self.mode, self.speed, self.steer, servo_deg))
+                    sys.stdout.flush()
+                    last_print = now
+
+                # 다음 poll까지 대기 (다음 모터 전송 시점을 넘기지 않으며, 정지 요청 시 즉시 깨어남)
+                timeout = max(0.0, next_send - monotonic())
+                if stop_evt.wait(min(timeout, poll_interval)):
+                    break
         
         except KeyboardInterrupt:
             log.info("사용자에 의해 중단되었습니다 (Ctrl+C).")
@@ -27,6 +27,9 @@ DEADZONE = 0.05
 # 하드웨어 설정
 CTRL_HZ = 50.0
 
+# 상태 출력 주기 (사람이 읽을 수 있는 속도면 충분)
+STATUS_PRINT_HZ = 10.0
+
 # 서보
 SERVO_PIN = 12
 SERVO_MIN_US, SERVO_MAX_US = 1000, 2000
@@ -1,7 +1,6 @@
 # input/__init__.py
 
 from .lidar_sensor import LidarSensor
-from .depth_camera_sensor import DepthCameraSensor
 from .gps_imu_sensor import GpsImuSensor
 from .manual_input import ManualInput
 
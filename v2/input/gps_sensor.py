@@ -6,10 +6,30 @@ pyubx2 라이브러리를 사용하며, 별도의 스레드에서 동작합니
 
 import threading
 import time
+import struct
 import serial
 import pyubx2
 import config # OAK-D 코드와 config를 공유한다고 가정
 
+# UBX 프레임: 동기 바이트(0xB5 0x62) + class(1) + id(1) + length(2, LE) + payload + 체크섬(2)
+_UBX_SYNC = b'\xb5\x62'
+_UBX_HEADER = struct.Struct('<BBH')
+_NAV_PVT_HEADER = _UBX_HEADER.pack(0x01, 0x07, 92) # NAV-PVT: class 0x01, id 0x07, 92바이트
+_UBX_LENGTH = struct.Struct('<H')
+_UBX_MAX_PAYLOAD = 1024  # 이보다 긴 length는 잘못 잡힌 동기 바이트로 간주
+
+# NAV-PVT payload에서 사용하는 필드만 추출 (u-blox 인터페이스 문서의 오프셋 기준)
+# fixType(20), numSV(23), lon(24), lat(28), hMSL(36), gSpeed(60), headMot(64), pDOP(76)
+_NAV_PVT = struct.Struct('<20xB2xBii4xi20xii8xH')
+
+def _ubx_checksum(msg):
+    """UBX 8비트 Fletcher 체크섬 (class부터 payload 끝까지)"""
+    ck_a = ck_b = 0
+    for b in msg:
+        ck_a += b
+        ck_b += ck_a
+    return ck_a & 0xFF, ck_b & 0xFF
+
 class GpsSensor(threading.Thread):
     """
     U-blox ZED-F9R GPS 수신기를 별도 스레드에서 실행하여
@@ -17,12 +37,13 @@ class GpsSensor(threading.Thread):
     (연결 실패 시 자동 재연결 기능 포함)
     """
     
-    def __init__(self, port, baudrate, logger=None):
+    def __init__(self, port, baudrate, logger=None, debug=False):
         """
         GpsSensor 스레드를 초기화합니다.
         :param port: 시리얼 포트 (예: 'COM3' 또는 '/dev/ttyUSB0')
         :param baudrate: 시리얼 보드레이트 (예: 38400, 115200, 460800)
         :param logger: 데이터 로깅을 위한 DataLogger 객체 (선택 사항)
+        :param debug: True이면 NAV-PVT 이외의 UBX 메시지를 pyubx2로 파싱해 출력 (선택 사항)
         """
         super().__init__()
         self.daemon = True
@@ -31,11 +52,15 @@ class GpsSensor(threading.Thread):
         self.baudrate = baudrate
         self.logger = logger
         self.running = True
+        self.debug = debug
         
         # --- ✨ 수정: IMU 센서와 동일한 스레드 안전 패턴 적용 ---
         self.data_lock = threading.Lock()
+        # 메시지마다 새 dict를 만들어 참조만 교체하고, 공개된 dict는 이후 수정하지 않음
+        # (메인 스레드와 로거가 같은 dict를 복사 없이 공유)
         self.latest_data = {
             'timestamp': 0.0,
+            'type': 'gps_nav_pvt',
             'fix_type': 0,
             'num_satellites': 0,
             'lat_deg': 0.0,
@@ -58,23 +83,27 @@ class GpsSensor(threading.Thread):
         # --- ✨ 수정: 견고한 재연결을 위한 '이중 루프' 구조 ---
         while self.running:
             ser = None
-            ubr = None
             try:
                 # 1. (바깥쪽 루프) 시리얼 포트 연결 시도
                 print(f"[GPS] {self.port} 시리얼 포트 연결 시도 중...")
                 ser = serial.Serial(self.port, self.baudrate, timeout=3.0)
-                ubr = pyubx2.UBXReader(ser)
+                self._rx = bytearray() # 수신 누적 버퍼 (재연결 시 초기화)
                 print(f"[GPS] {self.port} 시리얼 포트 연결 성공.")
 
                 # 2. (안쪽 루프) 데이터 읽기
+                # (UBX 프레임을 직접 잘라내고, NAV-PVT는 struct로 바로 해석)
                 while self.running:
                     try:
-                        (raw_data, parsed_data) = ubr.read()
-                        
-                        if parsed_data is not None:
-                            if parsed_data.identity == "NAV-PVT":
-                                # NAV-PVT 메시지 수신 성공
-                                self._process_nav_pvt(parsed_data)
+                        frame = self._read_ubx_frame(ser)
+                        if frame is None:
+                            continue # 타임아웃 또는 체크섬 불일치
+
+                        if frame[2:6] == _NAV_PVT_HEADER:
+                            # NAV-PVT 메시지 수신 성공 (payload는 프레임 6바이트 이후)
+                            self._process_nav_pvt(_NAV_PVT.unpack_from(frame, 6))
+                        elif self.debug:
+                            # (디버그) 그 외 메시지는 pyubx2로 파싱하여 출력
+                            print(f"[GPS] {pyubx2.UBXReader.parse(frame)}")
 
                     except (pyubx2.UBXStreamError, pyubx2.UBXParseError) as e:
                         print(f"[GPS] 경고: UBX 메시지 파싱 오류: {e}")
@@ -104,44 +133,91 @@ class GpsSensor(threading.Thread):
         print("[GPS] GPS 스레드 종료 완료.")
         # --- 수정 끝 ---
 
-    def _process_nav_pvt(self, data):
+    def _read_ubx_frame(self, ser):
+        """
+        시리얼 스트림에서 UBX 프레임 하나를 꺼냅니다. (NMEA 등 그 외 바이트는 건너뜀)
+        수신된 바이트를 한 번에 읽어 누적 버퍼에 쌓고, 버퍼에서 프레임을 잘라냅니다.
+        (1바이트씩 읽으며 동기 바이트를 찾지 않으므로 시스템 호출 수가 크게 줄어듦)
+        :param ser: 열린 serial.Serial 객체
+        :return: 동기 바이트부터 체크섬까지의 프레임 bytes, 타임아웃/체크섬 오류 시 None
         """
-        파싱된 NAV-PVT 데이터를 처리하고, 스레드 안전하게
+        buf = self._rx
+        while True:
+            start = buf.find(_UBX_SYNC)
+            if start < 0:
+                # 동기 바이트 없음: 마지막 1바이트(0xB5일 수 있음)만 남기고 버림
+                del buf[:-1]
+            else:
+                if start:
+                    del buf[:start]
+                if len(buf) >= 6:
+                    length = _UBX_LENGTH.unpack_from(buf, 4)[0]
+                    if length > _UBX_MAX_PAYLOAD:
+                        del buf[:2] # 잘못된 동기 바이트 -> 다음 위치부터 다시 탐색
+                        continue
+                    total = length + 8 # 동기(2) + 헤더(4) + payload + 체크섬(2)
+                    if len(buf) >= total:
+                        ck = _ubx_checksum(memoryview(buf)[2:total - 2])
+                        if ck != (buf[total - 2], buf[total - 1]):
+                            print("[GPS] 경고: UBX 체크섬 불일치, 프레임 무시")
+                            del buf[:2]
+                            return None
+                        frame = bytes(buf[:total])
+                        del buf[:total]
+                        return frame
+
+            # 프레임이 완성되지 않았으면 수신된 만큼 한 번에 읽음 (없으면 첫 바이트까지 대기)
+            chunk = ser.read(ser.in_waiting or 1)
+            if not chunk:
+                return None # 타임아웃
+            buf += chunk
+
+    def _process_nav_pvt(self, fields):
+        """
+        NAV-PVT 필드를 처리하고, 스레드 안전하게
         self.latest_data를 업데이트하며 로깅을 수행합니다.
+        :param fields: _NAV_PVT로 해석한 (fixType, numSV, lon, lat, hMSL, gSpeed, headMot, pDOP) 원시 값
         """
+        fix_type, num_sv, lon, lat, h_msl, g_speed, head_mot, p_dop = fields
         now = time.time()
         
-        # 메인 스레드와 공유하는 데이터이므로 Lock을 잡고 업데이트
+        # 새 스냅샷은 Lock 밖에서 생성
+        new_data = {
+            'timestamp': now,
+            'type': 'gps_nav_pvt',
+            'fix_type': fix_type,
+            'num_satellites': num_sv,
+            # 위도/경도 (1e-7 deg -> deg)
+            'lat_deg': lat * 1e-7,
+            'lon_deg': lon * 1e-7,
+            # 고도 (mm -> m)
+            'altitude_msl_m': h_msl / 1000.0,
+            # 지상 속도 (mm/s -> km/h)
+            'ground_speed_kmh': g_speed * 0.0036,
+            # 헤딩 (1e-5 deg -> 도)
+            'heading_deg': head_mot * 1e-5,
+            # pDOP (0.01 단위)
+            'pDOP': p_dop * 0.01,
+        }
+
+        # Lock 안에서는 참조 교체만 수행
         with self.data_lock:
-            self.latest_data = {
-                'timestamp': now,
-                'type': 'gps_nav_pvt',
-                'fix_type': data.fixType,
-                'num_satellites': data.numSV,
-                'lat_deg': data.lat,
-                'lon_deg': data.lon,
-                # 고도 (mm -> m)
-                'altitude_msl_m': data.hMSL / 1000.0,
-                # 지상 속도 (mm/s -> km/h)
-                'ground_speed_kmh': data.gSpeed * 0.0036,
-                # 헤딩 (도)
-                'heading_deg': data.headMot,
-                'pDOP': data.pDOP,
-            }
+            self.latest_data = new_data
 
         # 로거가 있으면 데이터 전송 (Lock 바깥에서 수행)
+        # (스냅샷은 수정되지 않으므로 로거 큐에 그대로 넘겨도 안전)
         if self.logger:
-            # log_data 함수는 내부적으로 Queue를 사용한다고 가정
-            self.logger.log_data(self.latest_data)
+            self.logger.log_data(new_data)
 
     def get_data(self):
         """
         메인 스레드에서 가장 최근의 파싱된 NAV-PVT 데이터를 가져갈 때 사용하는 함수.
-        :return: GPS 데이터 딕셔너리 (IMU와 동일한 형식)
+        :return: GPS 데이터 딕셔너리 (IMU와 동일한 형식, 읽기 전용 - 수정 금지)
         """
         # --- ✨ 수정: IMU 센서와 동일한 스레드 안전 패턴 적용 ---
+        # (공개된 스냅샷은 수정되지 않으므로 복사 없이 참조를 반환)
         with self.data_lock:
-            return self.latest_data.copy()
+            return self.latest_data
         # --- 수정 끝 ---
 
     def stop(self):
@@ -10,9 +10,38 @@ import threading
 import asyncio
 import time
 import struct
+import collections
 from bleak import BleakScanner, BleakClient
 import config  # config.py가 있다고 가정
 
+# WitMotion 0x61 패킷 데이터부: 리틀 엔디안 int16 9개 (Acc xyz, Gyro xyz, Angle xyz)
+_WIT_PAYLOAD = struct.Struct('<9h')
+
+# WitMotion 0x61 패킷 구조:
+# 헤더(0x55 0x61) + 데이터(18byte) + 체크섬(2byte) = 총 22byte
+FULL_PACKET_LENGTH = 22
+
+# 이미 처리한 앞부분이 이 크기를 넘으면 버퍼를 한 번에 정리(compaction)
+_BUFFER_COMPACT_SIZE = 4096
+
+# BLE 재연결 대기 시간 범위 (초, 지수 증가)
+_BACKOFF_MIN = 1.0
+_BACKOFF_MAX = 8.0
+
+# 원시 int16 값 -> 물리 단위 변환 계수
+_ACC_SCALE = 16.0 / 32768.0     # g
+_GYRO_SCALE = 2000.0 / 32768.0  # deg/s
+_ANG_SCALE = 180.0 / 32768.0    # deg
+
+# 파싱된 IMU 샘플 1개 (불변 객체이므로 참조만 넘겨도 안전)
+ImuSample = collections.namedtuple(
+    'ImuSample',
+    'timestamp acc_x acc_y acc_z gyro_x gyro_y gyro_z roll pitch yaw'
+)
+
+# 첫 패킷 수신 전 초기값 (timestamp 0.0 = 아직 데이터 없음)
+_EMPTY_SAMPLE = ImuSample(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
 class GpsImuSensor:
     """
     별도 스레드에서 비동기 BLE 통신을 실행하여
@@ -26,22 +55,20 @@ class GpsImuSensor:
     TARGET_CHAR_UUID_WRITE = "0000ffe9-0000-1000-8000-00805f9a34fb" # Write
 
     def __init__(self, logger=None):
-        self.latest_data = {
-            "timestamp": 0.0,
-            "acc_x": 0.0, "acc_y": 0.0, "acc_z": 0.0,
-            "gyro_x": 0.0, "gyro_y": 0.0, "gyro_z": 0.0,
-            "roll": 0.0,  # Angle X
-            "pitch": 0.0, # Angle Y
-            "yaw": 0.0,   # Angle Z
-            # GPS 데이터 (필요 시 확장)
-            "latitude": 0.0,
-            "longitude": 0.0
-        }
+        # 최신 샘플 (roll/pitch/yaw = Angle X/Y/Z)
+        # 갱신 시 새 ImuSample로 참조만 교체하므로 읽기 측에 락/복사가 필요 없습니다.
+        self._sample = _EMPTY_SAMPLE
         self.running = True
         self.logger = logger
+
+        # 종료 신호용 asyncio.Event (BLE 스레드의 이벤트 루프 안에서 생성)
+        self._loop = None
+        self._stop_event = None
         
         # 데이터 처리를 위한 버퍼 (Code B의 TempBytes 역할)
+        # 처리한 바이트를 매번 지우지 않고 읽기 위치(_head)만 전진시킵니다.
         self.data_buffer = bytearray()
+        self._head = 0
         
         self.thread = threading.Thread(target=self._run_async_loop, daemon=True)
         print("[GPS/IMU] 센서 스레드 초기화 완료.")
@@ -55,10 +82,17 @@ class GpsImuSensor:
         """스레드 종료"""
         print("[GPS/IMU] 종료 신호 수신.")
         self.running = False
+        # 대기 중인 BLE 루프를 즉시 깨움 (다른 스레드이므로 threadsafe 호출)
+        loop, event = self._loop, self._stop_event
+        if loop is not None and event is not None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # 이벤트 루프가 이미 종료됨
 
     def get_data(self):
-        """최신 데이터 반환"""
-        return self.latest_data.copy()
+        """최신 데이터 반환 (ImuSample, 복사 없이 참조 반환)"""
+        return self._sample
 
     def _run_async_loop(self):
         """asyncio 이벤트 루프 실행"""
@@ -67,8 +101,27 @@ class GpsImuSensor:
         except Exception as e:
             print(f"[GPS/IMU] 비동기 루프 치명적 오류: {e}")
 
+    async def _wait_stop(self, timeout):
+        """
+        최대 timeout초 동안 대기합니다. (재연결 대기용)
+        :return: 대기 중 stop()이 호출되었으면 True
+        """
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
     async def _ble_communication_loop(self):
         """BLE 연결 및 재연결 관리 루프"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if not self.running:
+            self._stop_event.set()
+
+        # 재연결 대기 시간: 실패할 때마다 1 -> 2 -> 4 -> 8초 (최대 8초), 연결 성공 시 초기화
+        backoff = _BACKOFF_MIN
+
         while self.running:
             device = None
             try:
@@ -89,8 +142,10 @@ class GpsImuSensor:
                             break
 
                 if not device:
-                    print("[GPS/IMU] 장치를 찾을 수 없습니다. 5초 후 재시도.")
-                    await asyncio.sleep(5)
+                    print(f"[GPS/IMU] 장치를 찾을 수 없습니다. {backoff:.0f}초 후 재시도.")
+                    if await self._wait_stop(backoff):
+                        break
+                    backoff = min(backoff * 2, _BACKOFF_MAX)
                     continue
 
                 # 2. 연결 시도
@@ -98,6 +153,7 @@ class GpsImuSensor:
                 async with BleakClient(device, timeout=10.0) as client:
                     if client.is_connected:
                         print("[GPS/IMU] BLE 연결 성공.")
+                        backoff = _BACKOFF_MIN
                         
                         # 서비스 확인 및 Notify 설정
                         # config에 UUID가 있다면 그것을 쓰고, 없으면 클래스 상수의 기본값 사용
@@ -108,101 +164,107 @@ class GpsImuSensor:
                             print(f"[GPS/IMU] 데이터 수신 시작 (UUID: {notify_uuid})")
                         except Exception as e:
                             print(f"[GPS/IMU] Notify 설정 실패. UUID를 확인하세요: {e}")
-                            await asyncio.sleep(2)
+                            if await self._wait_stop(backoff):
+                                break
+                            backoff = min(backoff * 2, _BACKOFF_MAX)
                             continue
 
                         # 연결 유지 루프
+                        # (stop() 호출 시 즉시 깨어나고, 1초마다 연결 상태 확인)
                         while self.running and client.is_connected:
-                            await asyncio.sleep(1.0)
+                            try:
+                                await asyncio.wait_for(self._stop_event.wait(), timeout=1.0)
+                            except asyncio.TimeoutError:
+                                pass
                 
                 print("[GPS/IMU] 연결 끊김.")
 
             except Exception as e:
                 print(f"[GPS/IMU] 통신 에러: {e}")
                 if self.running:
-                    await asyncio.sleep(5)
+                    if await self._wait_stop(backoff):
+                        break
+                    backoff = min(backoff * 2, _BACKOFF_MAX)
 
     def _notification_handler(self, sender, data: bytearray):
         """
         [Code B의 핵심 파싱 로직 이식]
         데이터가 들어오면 버퍼에 쌓고 0x61 패킷을 찾아 파싱합니다.
         """
-        self.data_buffer.extend(data)
-
-        # WitMotion 0x61 패킷 구조:
-        # 헤더(0x55 0x61) + 데이터(18byte) + 체크섬(2byte) = 총 22byte
-        FULL_PACKET_LENGTH = 22
+        buf = self.data_buffer
+        buf.extend(data)
+        head = self._head
+        end = len(buf)
 
-        while len(self.data_buffer) >= FULL_PACKET_LENGTH:
-            # 1. 헤더(0x55) 찾기
-            if self.data_buffer[0] != 0x55:
-                del self.data_buffer[0]
-                continue
+        while end - head >= FULL_PACKET_LENGTH:
+            # 1. 헤더(0x55) 찾기 (C 수준 검색으로 쓰레기 바이트를 한 번에 건너뜀)
+            i = buf.find(0x55, head)
+            if i < 0:
+                head = end
+                break
+            if end - i < FULL_PACKET_LENGTH:
+                head = i  # 패킷이 아직 다 도착하지 않음
+                break
             
             # 2. 두 번째 바이트가 0x61인지 확인 (IMU 통합 데이터)
             # (만약 GPS 데이터 0x57 등 다른 패킷도 처리하려면 여기서 분기)
-            if self.data_buffer[1] != 0x61:
+            if buf[i + 1] != 0x61:
                 # 0x61이 아니면 이 0x55는 유효한 헤더가 아님 (혹은 처리 안 하는 패킷)
-                del self.data_buffer[0]
+                head = i + 1
                 continue
 
-            # 3. 전체 패킷 추출
-            packet = self.data_buffer[:FULL_PACKET_LENGTH]
-            
-            # 4. 데이터 파싱 실행
+            # 3. 데이터 파싱 실행 (복사 없이 버퍼 내 위치로 전달)
             try:
                 # 헤더 2바이트(0,1)를 제외한 데이터 부분(2~) 전달
-                self._parse_witmotion_data(packet[2:])
+                self._parse_witmotion_data(buf, i + 2)
             except Exception as e:
                 print(f"[GPS/IMU] 파싱 중 에러: {e}")
 
-            # 5. 처리된 패킷 버퍼에서 제거
-            del self.data_buffer[:FULL_PACKET_LENGTH]
+            # 4. 처리된 패킷만큼 읽기 위치 전진
+            head = i + FULL_PACKET_LENGTH
+
+        # 5. 처리 완료된 앞부분 정리
+        if head >= end:
+            buf.clear()
+            head = 0
+        elif head > _BUFFER_COMPACT_SIZE:
+            del buf[:head]
+            head = 0
+        self._head = head
 
-    def _parse_witmotion_data(self, data_bytes):
+    def _parse_witmotion_data(self, data_bytes, offset=0):
         """
         Code B의 processData 메서드와 동일한 로직
-        data_bytes: 20바이트 (데이터 18바이트 + 체크섬 2바이트 포함 가능하지만 인덱스로 접근)
+        data_bytes: 데이터부(18바이트)를 offset 위치부터 포함하는 버퍼
+        offset: data_bytes 내 데이터부 시작 위치
         """
-        # 리틀 엔디안 변환 및 스케일링
+        # 리틀 엔디안 int16 9개를 한 번에 변환 (부호 처리 포함)
+        (ax_r, ay_r, az_r,
+         gx_r, gy_r, gz_r,
+         rx_r, ry_r, rz_r) = _WIT_PAYLOAD.unpack_from(data_bytes, offset)
+
         # Acc (g)
-        ax = self._get_sign_int16(data_bytes[1] << 8 | data_bytes[0]) / 32768.0 * 16.0
-        ay = self._get_sign_int16(data_bytes[3] << 8 | data_bytes[2]) / 32768.0 * 16.0
-        az = self._get_sign_int16(data_bytes[5] << 8 | data_bytes[4]) / 32768.0 * 16.0
+        ax = ax_r * _ACC_SCALE
+        ay = ay_r * _ACC_SCALE
+        az = az_r * _ACC_SCALE
         
         # Gyro (deg/s)
-        gx = self._get_sign_int16(data_bytes[7] << 8 | data_bytes[6]) / 32768.0 * 2000.0
-        gy = self._get_sign_int16(data_bytes[9] << 8 | data_bytes[8]) / 32768.0 * 2000.0
-        gz = self._get_sign_int16(data_bytes[11] << 8 | data_bytes[10]) / 32768.0 * 2000.0
+        gx = gx_r * _GYRO_SCALE
+        gy = gy_r * _GYRO_SCALE
+        gz = gz_r * _GYRO_SCALE
         
         # Angle (deg)
-        ang_x = self._get_sign_int16(data_bytes[13] << 8 | data_bytes[12]) / 32768.0 * 180.0
-        ang_y = self._get_sign_int16(data_bytes[15] << 8 | data_bytes[14]) / 32768.0 * 180.0
-        ang_z = self._get_sign_int16(data_bytes[17] << 8 | data_bytes[16]) / 32768.0 * 180.0
-
-        # 최신 데이터 업데이트
-        self.latest_data.update({
-            "timestamp": time.time(),
-            "acc_x": round(ax, 3),
-            "acc_y": round(ay, 3),
-            "acc_z": round(az, 3),
-            "gyro_x": round(gx, 3),
-            "gyro_y": round(gy, 3),
-            "gyro_z": round(gz, 3),
-            "roll": round(ang_x, 3),
-            "pitch": round(ang_y, 3),
-            "yaw": round(ang_z, 3)
-        })
+        ang_x = rx_r * _ANG_SCALE
+        ang_y = ry_r * _ANG_SCALE
+        ang_z = rz_r * _ANG_SCALE
 
-        if self.logger:
-            self.logger.log_data({'type': 'gps_imu', **self.latest_data})
+        # 최신 데이터 업데이트 (참조 교체는 원자적)
+        # 반올림은 표시 단계({:.3f})에서 처리하고 저장 값은 원본 정밀도를 유지합니다.
+        sample = ImuSample(time.time(), ax, ay, az, gx, gy, gz, ang_x, ang_y, ang_z)
+        self._sample = sample
 
-    @staticmethod
-    def _get_sign_int16(num):
-        """Code B의 getSignInt16 정적 메서드"""
-        if num >= 32768:  # 2^15
-            num -= 65536  # 2^16
-        return num
+        if self.logger:
+            self.logger.log_data({'type': 'gps_imu', **sample._asdict()})
 
 # -----------------------------------------------
 # 테스트 코드
@@ -221,10 +283,10 @@ if __name__ == '__main__':
             time.sleep(0.5)
             data = sensor.get_data()
             # 데이터가 갱신되었을 때만 출력하거나 0이 아닐 때 출력
-            if data['timestamp'] > 0:
-                print(f"Time: {data['timestamp']:.2f} | "
-                      f"Roll: {data['roll']:.2f}, Pitch: {data['pitch']:.2f}, Yaw: {data['yaw']:.2f} | "
-                      f"AccX: {data['acc_x']:.2f}")
+            if data.timestamp > 0:
+                print(f"Time: {data.timestamp:.2f} | "
+                      f"Roll: {data.roll:.2f}, Pitch: {data.pitch:.2f}, Yaw: {data.yaw:.2f} | "
+                      f"AccX: {data.acc_x:.2f}")
     except KeyboardInterrupt:
         print("\n종료 중...")
     finally:
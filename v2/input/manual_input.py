@@ -1,10 +1,10 @@
 # input/manual_input.py
 import threading
-import time
 import sys
 import os
 import struct
 import array
+import config
 
 # 운영체제에 따라 필요한 라이브러리가 다를 수 있습니다.
 # 이 코드는 리눅스 환경을 기준으로 작성되었습니다.
@@ -26,6 +26,10 @@ THROTTLE_AXIS_NAME = 'y'  # 스로틀(전/후진)에 사용할 조이스틱 축
 STEER_AXIS_NAME = 'rx'    # 조향(좌/우)에 사용할 조이스틱 축 이름
 DEADZONE = 0.08           # 조이스틱의 민감도를 조절하기 위한 데드존
 
+# 조이스틱 이벤트 구조체 (struct js_event: 시간(ms), 값, 타입, 번호 = 8바이트)
+_JS_EVENT = struct.Struct('IhBB')
+JS_READ_SIZE = _JS_EVENT.size * 64  # read() 1회에 최대 64개 이벤트를 한꺼번에 읽음
+
 # 조이스틱 이벤트 타입
 JS_EVENT_BUTTON = 0x01
 JS_EVENT_AXIS = 0x02
@@ -66,7 +70,13 @@ class ManualInput(threading.Thread):
         self.joystick_connected = False
         self.keyboard_active = False
 
+        # 조이스틱/키보드 fd를 epoll에 등록하여, 입력이 준비될 때만 깨어남
+        self._epoll = None
+        self._js_fd = -1
+        self._kb_fd = -1
+
         if IS_LINUX:
+            self._epoll = select.epoll()
             self._init_joystick()
             self._init_keyboard()
         else:
@@ -109,6 +119,8 @@ class ManualInput(threading.Thread):
             fcntl.fcntl(self.jsdev, fcntl.F_SETFL, flags | os.O_NONBLOCK)
 
             self.axis_states = {name: 0.0 for name in self.axis_map}
+            self._js_fd = self.jsdev.fileno()
+            self._epoll.register(self._js_fd, select.EPOLLIN)
             self.joystick_connected = True
             print(f"[Input] 조이스틱 '{dev_path}' 연결 성공!")
 
@@ -122,20 +134,26 @@ class ManualInput(threading.Thread):
             self._fd = sys.stdin.fileno()
             self._old_settings = termios.tcgetattr(self._fd)
             tty.setcbreak(self._fd)
+            # 키보드는 조이스틱이 없을 때만 사용하므로 그때만 epoll에 등록
+            if not self.joystick_connected:
+                self._epoll.register(self._fd, select.EPOLLIN)
+                self._kb_fd = self._fd
             self.keyboard_active = True
-        except (termios.error, AttributeError) as e:
+        except (termios.error, AttributeError, OSError) as e:
             print(f"[Input] 키보드 초기화 실패: {e}. 터미널 환경이 아닐 수 있습니다.")
             self.keyboard_active = False
 
     def run(self):
         """스레드가 시작되면 이 함수가 계속 반복 실행됩니다."""
+        # 입력이 들어오면 즉시 깨어나고, 없으면 최대 제어 주기만큼 대기 후 running 플래그 재확인
+        timeout = 1.0 / config.MAIN_LOOP_HZ
+        js_fd, kb_fd = self._js_fd, self._kb_fd
         while self.running:
-            if self.joystick_connected:
-                self._poll_joystick()
-            elif self.keyboard_active:
-                self._poll_keyboard()
-
-            time.sleep(0.02) # 루프가 너무 빨리 돌지 않도록 약간의 대기시간 추가
+            for fd, _ in self._epoll.poll(timeout):
+                if fd == js_fd:
+                    self._poll_joystick()
+                elif fd == kb_fd:
+                    self._poll_keyboard()
         
         # --------------------------------------------------------
         # (!!!) 여기에 프로그램 종료 시 필요한 '정리' 코드를 넣으세요.
@@ -146,18 +164,23 @@ class ManualInput(threading.Thread):
         if self.joystick_connected:
             self.jsdev.close()
             print("[Input] 조이스틱 장치 연결 해제.")
+        if self._epoll is not None:
+            self._epoll.close()
 
     def _poll_joystick(self):
         """조이스틱 입력을 읽어 throttle과 steering 값을 업데이트합니다."""
         try:
             while True: # 버퍼에 쌓인 모든 이벤트를 처리
-                evbuf = self.jsdev.read(8)
-                t_ms, value, etype, number = struct.unpack('IhBB', evbuf)
-
-                if (etype & ~JS_EVENT_INIT) == JS_EVENT_AXIS:
-                    if number < len(self.axis_map):
-                        axis_name = self.axis_map[number]
-                        self.axis_states[axis_name] = norm_axis(value)
+                # 여러 이벤트를 한 번의 시스템 호출로 읽음 (없으면 BlockingIOError)
+                chunk = os.read(self._js_fd, JS_READ_SIZE)
+                if not chunk:
+                    break
+                # (커널은 항상 이벤트 단위(8바이트)로 반환하므로 chunk 길이는 8의 배수)
+                for t_ms, value, etype, number in _JS_EVENT.iter_unpack(chunk):
+                    if (etype & ~JS_EVENT_INIT) == JS_EVENT_AXIS:
+                        if number < len(self.axis_map):
+                            axis_name = self.axis_map[number]
+                            self.axis_states[axis_name] = norm_axis(value)
 
         except BlockingIOError:
              # 더 이상 읽을 이벤트가 없으면 예외 발생 (정상)
@@ -173,10 +196,9 @@ class ManualInput(threading.Thread):
 
     def _poll_keyboard(self):
         """키보드 입력을 읽어 throttle과 steering 값을 업데이트합니다."""
-        # select를 사용하여 논블로킹으로 키 입력 확인
-        if select.select([sys.stdin], [], [], 0) == ([sys.stdin], [], []):
-            key = sys.stdin.read(1)
-            
+        # (입력 준비 여부는 run()의 epoll이 이미 확인함)
+        key = sys.stdin.read(1)
+        if key:
             # 화살표 키 입력 처리
             if key == '\x1b':
                 key2 = sys.stdin.read(1)
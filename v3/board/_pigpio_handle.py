@@ -0,0 +1,39 @@
+# board/_pigpio_handle.py
+"""
+pigpio 데몬 연결(소켓)을 프로세스 전체에서 하나만 공유하기 위한 모듈입니다.
+
+pigpio.pi()는 호출할 때마다 pigpiod와 새 TCP 소켓을 엽니다.
+액추에이터가 늘어나도 같은 연결을 재사용하도록 get_pi()로만 핸들을 얻고,
+연결 해제는 인터프리터 종료 시 atexit에서 한 번만 수행합니다.
+"""
+
+import atexit
+import threading
+import pigpio
+
+_pi = None
+_lock = threading.Lock()
+
+
+def get_pi():
+    """
+    공유 pigpio 핸들을 반환합니다. (없거나 끊긴 경우 새로 연결)
+    :return: pigpio.pi 객체 (연결 실패 시 .connected 가 False)
+    """
+    global _pi
+    with _lock:
+        if _pi is None or not _pi.connected:
+            _pi = pigpio.pi()
+        return _pi
+
+
+def _close_pi():
+    """프로그램 종료 시 공유 핸들의 연결을 해제합니다."""
+    global _pi
+    with _lock:
+        if _pi is not None and _pi.connected:
+            _pi.stop()
+        _pi = None
+
+
+atexit.register(_close_pi)
@@ -9,6 +9,7 @@ pigpio 라이브러리를 사용하여 PWM 신호를 안정적으로 생성합
 import pigpio
 import time
 import config  # 설정 파일 임포트
+from ._pigpio_handle import get_pi
 
 class ActuatorControl:
     def __init__(self):
@@ -17,7 +18,8 @@ class ActuatorControl:
         """
         print("[Board] 액추에이터 초기화 시작...")
         
-        self.pi = pigpio.pi()
+        # pigpio 데몬 연결은 프로세스 전체에서 하나를 공유 (board/_pigpio_handle.py)
+        self.pi = get_pi()
         if not self.pi.connected:
             print("[Board] 에러: pigpio 데몬에 연결할 수 없습니다.")
             print("(!!!) 'sudo systemctl start pigpiod' 명령어를 실행했는지 확인하세요.")
@@ -52,11 +54,41 @@ class ActuatorControl:
         self.pi.write(config.MOTOR_RIGHT_IN2, 0)
 
         # 서보 중앙 정렬 (pigpio 서보 펄스는 500~2500 범위)
-        self.pi.set_servo_pulsewidth(config.STEER_SERVO_PIN, config.SERVO_CENTER_PULSE)
+        self._servo_hw_pwm = getattr(config, 'STEER_SERVO_HW_PWM', False)
+        self._servo_freq = getattr(config, 'SERVO_PWM_FREQ', 50)
+        self._write_servo(config.SERVO_CENTER_PULSE)
         time.sleep(0.5) # 서보가 중앙으로 이동할 시간
 
+        # --- 4. 동일 명령 생략을 위한 캐시 ---
+        # 방향 핀 번호를 미리 묶어 두고, 마지막으로 전송한 방향/PWM 값을 기억하여
+        # 값이 바뀌지 않았으면 pigpio 전송(소켓 왕복)을 생략합니다.
+        self._in1_pins = (config.MOTOR_LEFT_IN1, config.MOTOR_RIGHT_IN1)
+        self._in2_pins = (config.MOTOR_LEFT_IN2, config.MOTOR_RIGHT_IN2)
+        self._pwm_pins = (config.MOTOR_LEFT_PWM, config.MOTOR_RIGHT_PWM)
+        self._last_direction = (0, 0)  # (IN1, IN2)
+        self._last_pwm = 0
+
+        # --- 5. 조향 각도 -> 서보 펄스 폭 변환 테이블 ---
+        # 조향 입력(-1.0 ~ 1.0)을 0.01 단위로 나눈 201개 구간의 펄스 폭(us)을 미리 계산합니다.
+        self._steer_lut = tuple(
+            max(500, min(2500, int(config.SERVO_CENTER_PULSE + (i / 100.0 - 1.0) * config.SERVO_RANGE_PULSE)))
+            for i in range(201)
+        )
+        self._last_pulse = config.SERVO_CENTER_PULSE
+
         print("[Board] 액추에이터 초기화 완료.")
 
+    def _write_servo(self, pulse_width):
+        """
+        조향 서보에 펄스 폭(us)을 전송합니다. (0이면 신호 중지)
+        하드웨어 PWM 사용 시 펄스 폭을 듀티비(1,000,000 = 100%)로 변환합니다.
+        """
+        if self._servo_hw_pwm:
+            # 듀티비 = pulse(us) / 주기(1e6/freq us) * 1e6 = pulse * freq
+            self.pi.hardware_PWM(config.STEER_SERVO_PIN, self._servo_freq, pulse_width * self._servo_freq)
+        else:
+            self.pi.set_servo_pulsewidth(config.STEER_SERVO_PIN, pulse_width)
+
     def set_throttle(self, speed):
         """
         차량의 스로틀(속도)을 설정합니다.
@@ -70,27 +102,28 @@ class ActuatorControl:
         pwm_val = max(0, min(255, pwm_val)) 
 
         if speed > 0:
-            # 전진 (IN1=1, IN2=0)
-            self.pi.write(config.MOTOR_LEFT_IN1, 1)
-            self.pi.write(config.MOTOR_LEFT_IN2, 0)
-            self.pi.write(config.MOTOR_RIGHT_IN1, 1)
-            self.pi.write(config.MOTOR_RIGHT_IN2, 0)
+            direction = (1, 0)  # 전진 (IN1=1, IN2=0)
         elif speed < 0:
-            # 후진 (IN1=0, IN2=1)
-            self.pi.write(config.MOTOR_LEFT_IN1, 0)
-            self.pi.write(config.MOTOR_LEFT_IN2, 1)
-            self.pi.write(config.MOTOR_RIGHT_IN1, 0)
-            self.pi.write(config.MOTOR_RIGHT_IN2, 1)
+            direction = (0, 1)  # 후진 (IN1=0, IN2=1)
         else:
-            # 정지 (IN1=0, IN2=0)
-            self.pi.write(config.MOTOR_LEFT_IN1, 0)
-            self.pi.write(config.MOTOR_LEFT_IN2, 0)
-            self.pi.write(config.MOTOR_RIGHT_IN1, 0)
-            self.pi.write(config.MOTOR_RIGHT_IN2, 0)
+            direction = (0, 0)  # 정지 (IN1=0, IN2=0)
+
+        pi = self.pi
 
-        # 양쪽 모터에 동일한 PWM 값 인가
-        self.pi.set_PWM_dutycycle(config.MOTOR_LEFT_PWM, pwm_val)
-        self.pi.set_PWM_dutycycle(config.MOTOR_RIGHT_PWM, pwm_val)
+        # 방향이 바뀐 경우에만 방향 핀 갱신
+        if direction != self._last_direction:
+            in1, in2 = direction
+            for pin in self._in1_pins:
+                pi.write(pin, in1)
+            for pin in self._in2_pins:
+                pi.write(pin, in2)
+            self._last_direction = direction
+
+        # 양쪽 모터에 동일한 PWM 값 인가 (값이 바뀐 경우에만)
+        if pwm_val != self._last_pwm:
+            for pin in self._pwm_pins:
+                pi.set_PWM_dutycycle(pin, pwm_val)
+            self._last_pwm = pwm_val
 
     def set_steering(self, angle):
         """
@@ -98,29 +131,37 @@ class ActuatorControl:
         :param angle: -1.0 (최대 좌회전) ~ 1.0 (최대 우회전)
         """
         
-        # 각도(-1.0 ~ 1.0)를 서보 펄스 폭(us)으로 변환
-        pulse_width = config.SERVO_CENTER_PULSE + (angle * config.SERVO_RANGE_PULSE)
-        
-        # 서보 펄스 폭 범위 제한 (500us ~ 2500us)
-        pulse_width = max(500, min(2500, pulse_width))
-        
-        self.pi.set_servo_pulsewidth(config.STEER_SERVO_PIN, pulse_width)
+        # 각도(-1.0 ~ 1.0)를 테이블 인덱스(0 ~ 200)로 변환
+        # (펄스 폭 범위 제한(500us ~ 2500us)은 테이블 생성 시 이미 적용됨)
+        i = int((angle + 1.0) * 100.0 + 0.5)
+        if i < 0:
+            i = 0
+        elif i > 200:
+            i = 200
+        pulse_width = self._steer_lut[i]
+
+        # 변화량이 데드밴드보다 작으면 전송 생략 (서보 떨림 및 불필요한 전송 방지)
+        if abs(pulse_width - self._last_pulse) < config.SERVO_DEADBAND_PULSE:
+            return
+
+        self._write_servo(pulse_width)
+        self._last_pulse = pulse_width
 
     def stop_all(self):
         """
-        비상 정지 및 pigpio 리소스 해제.
+        비상 정지 (모터 정지 및 서보 신호 중지).
         프로그램 종료 시 반드시 호출되어야 합니다.
+        (공유 pigpio 연결은 종료 시 atexit에서 해제됩니다.)
         """
         print("[Board] 모든 액추에이터 정지 및 리소스 해제...")
         
-        # 1. 모터 정지
+        # 1. 모터 정지 (캐시를 무효화하여 정지 명령을 반드시 전송)
+        self._last_direction = None
+        self._last_pwm = None
         self.set_throttle(0)
         
         # 2. 서보 PWM 신호 중지 (0으로 설정)
-        self.pi.set_servo_pulsewidth(config.STEER_SERVO_PIN, 0)
-        
-        # 3. pigpio 연결 해제
-        self.pi.stop()
+        self._write_servo(0)
         print("[Board] 정지 완료.")
 
 # -----------------------------------------------
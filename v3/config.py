@@ -14,6 +14,7 @@ import os
 # =================================================================
 # 라즈베리파이의 BCM 핀 번호 기준입니다.
 # pigpio 라이브러리를 사용하므로, 실행 전 'sudo systemctl start pigpiod' 필수!
+# (출력 전용이므로 pigpiod는 '-m -s 10' 옵션으로 실행 권장. README.md 참고)
 
 # (!!!) 왼쪽 모터 드라이버 핀 번호
 MOTOR_LEFT_PWM = 12   # 속도 제어 (ENA)
@@ -32,6 +33,13 @@ STEER_SERVO_PIN = 18
 # 500us ~ 2500us 사이에서 조절합니다.
 SERVO_CENTER_PULSE = 1500  # 서보 중앙 정렬 시 펄스 값
 SERVO_RANGE_PULSE  = 500   # 최대 조향 범위 (예: 500 -> 1000~2000us 범위로 조향)
+# 이전 전송 값과의 차이가 이 값(us)보다 작으면 서보 갱신을 생략합니다. (떨림 방지)
+SERVO_DEADBAND_PULSE = 5
+
+# 조향 서보를 하드웨어 PWM으로 구동할지 여부
+# (GPIO 12/13/18/19만 가능. pigpio의 DMA 샘플링 대신 PWM 주변장치가 직접 펄스를 생성)
+STEER_SERVO_HW_PWM = True
+SERVO_PWM_FREQ = 50  # 서보 제어 주파수 (Hz, 일반 서보는 50Hz)
 
 # =================================================================
 # 2. INPUT / SENSORS (센서)
@@ -45,6 +53,9 @@ LIDAR_PORT = '/dev/ttyUSB0'
 # depthai 라이브러리가 자동으로 장치를 찾지만, 해상도 등 세부 설정이 가능합니다.
 OAKD_RGB_RESOLUTION = (640, 480) # RGB 카메라 프리뷰 해상도
 OAKD_RGB_FPS = 30.0              # RGB 카메라 FPS
+# Depth 출력 해상도. 장치에서 축소하여 USB 전송량과 호스트 처리량을 줄입니다.
+# (RGB에 정렬되므로 RGB 해상도의 절반 = 픽셀 수 1/4)
+OAKD_DEPTH_OUTPUT_SIZE = (OAKD_RGB_RESOLUTION[0] // 2, OAKD_RGB_RESOLUTION[1] // 2)
 
 # (!!!) WT901BLECL (블루투스 GPS/IMU)
 GPS_DEVICE_NAME = 'WT901BLECL'  # 블루투스 스캔 시 표시되는 장치 이름
@@ -69,6 +80,10 @@ MANUAL_STEERING_ANGLE = 1.0  # 최대 좌/우 조향 각도 (0.0 ~ 1.0)
 # 20Hz는 1초에 20번 루프를 실행하며, 한 루프 당 0.05초가 소요됨을 의미합니다.
 MAIN_LOOP_HZ = 20.0
 
+# 라이다 전방 장애물 안전 규칙: 전방 좌우 각도(deg) 안, 정지 거리(m) 이내에 장애물이 있으면 전진 중단
+SAFETY_FRONT_ANGLE_DEG = 30.0
+SAFETY_FRONT_STOP_DIST_M = 0.8
+
 # =================================================================
 # 5. LOGGING (데이터 로깅)
 # =================================================================
@@ -89,6 +104,22 @@ LOG_IMAGE_DIRNAME = 'images'
 # 너무 높게 설정하면 라즈베리파이 성능에 부담이 될 수 있습니다.
 LOG_IMAGE_SAVE_HZ = 1.0  # 초당 1회 이미지 저장
 
+# CSV 파일 flush 최소 간격 (초). 레코드마다 write() 시스템 호출을 하지 않고 모아서 씁니다.
+LOG_FLUSH_INTERVAL_S = 0.25
+
+# CSV 파일 쓰기 버퍼 크기 (바이트). flush 간격 사이의 기록이 모두 담기도록 크게 잡아
+# 버퍼가 차서 중간에 write()가 일어나지 않게 합니다.
+LOG_WRITE_BUFFER_BYTES = 1 << 20
+
+# 로그 큐 최대 크기. 디스크가 밀려도 메모리가 무한히 늘지 않도록 제한하며,
+# 가득 차면 새 기록은 버려지고 버린 개수가 'logger_stats' 행으로 기록됩니다.
+LOG_QUEUE_MAX = 50000
+
+# 제어 출력(control_output) 로깅 간격. 값이 바뀌지 않으면 N tick마다 한 번만 기록하고,
+# 모드가 바뀌거나 스로틀/조향 변화량 합이 EPS를 넘으면 즉시 기록합니다.
+LOG_CONTROL_DECIMATE = 10
+LOG_CONTROL_EPS = 0.01
+
 # --- 다른 모듈에서 사용할 전체 경로 (자동 생성되므로 수정 불필요) ---
 LOG_CSV_FILE_PATH = os.path.join(LOG_BASE_DIR, LOG_CSV_FILENAME)
 LOG_IMAGE_DIR_PATH = os.path.join(LOG_BASE_DIR, LOG_IMAGE_DIRNAME)
@@ -6,8 +6,31 @@
 """
 
 import time
+import numpy as np
 import config
 
+# numba가 설치되어 있으면 전방 최소 거리 탐색을 네이티브 루프로 컴파일해 사용합니다.
+# (없으면 numpy 마스크 경로 사용)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _frontal_min(angles, dists, angle_range, max_dist_mm):
+        """전방 각도 범위 내 유효 거리의 최솟값(mm)을 반환합니다. (없으면 0.0)"""
+        best = max_dist_mm
+        rear_start = 360.0 - angle_range
+        for i in range(angles.shape[0]):
+            a = angles[i]
+            d = dists[i]
+            if ((0.0 <= a <= angle_range) or (rear_start <= a < 360.0)) and 0.0 < d < best:
+                best = d
+        return best if best < max_dist_mm else 0.0
+else:
+    _frontal_min = None
+
 class LogicController:
     def __init__(self, actuators, logger=None):
         """
@@ -27,11 +50,30 @@ class LogicController:
         self.manual_steering = 0.0
         
         # --- 센서 데이터 저장 변수 ---
-        self.lidar_data = []
+        # (각도 배열[deg], 거리 배열[mm]) - LidarSensor.get_data()와 같은 float32 numpy 배열 쌍
+        self.lidar_data = (np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32))
         self.gps_data = {}
         self.rgb_frame = None
         self.depth_frame = None
 
+        # 전방 장애물 탐색 범위는 고정값이므로 경계값을 미리 계산해 둠 (매 tick 재계산하지 않음)
+        self._front_angle = float(config.SAFETY_FRONT_ANGLE_DEG)
+        self._front_rear_start = 360.0 - self._front_angle
+        self._front_max_mm = float(config.SAFETY_FRONT_STOP_DIST_M) * 1000.0
+
+        # numba 커널은 첫 호출 때 컴파일되므로, 제어 루프가 아닌 초기화 시점에 미리 한 번 호출
+        if _frontal_min is not None:
+            _frontal_min(*self.lidar_data, self._front_angle, self._front_max_mm)
+
+        # 전방 장애물 탐색 결과 캐시: (탐색한 lidar_data 튜플, 결과)
+        # main은 새 스캔이 없으면 같은 튜플 객체를 다시 넘기므로, 같은 객체면 탐색을 생략
+        # (튜플 참조를 계속 쥐고 있으므로 id 재사용으로 인한 오판이 없음)
+        self._obstacle_cache = (None, None)
+
+        # 제어 출력 로깅 간소화용: 마지막으로 기록한 (mode, throttle, steering)과 기록 후 경과 tick 수
+        self._last_logged = (None, 0.0, 0.0)
+        self._ticks_since_log = 0
+
         print(f"[Control] 로직 컨트롤러 초기화 완료. 시작 모드: {self.mode}")
 
     def update_manual_input(self, throttle, steering):
@@ -52,91 +94,126 @@ class LogicController:
         안전 -> 모드별 제어 순서로 로직을 실행합니다.
         """
         
+        # 루프마다 반복되는 속성 조회를 줄이기 위해 지역 변수로 한 번만 가져옴
+        mode = self.mode
+        manual_throttle = self.manual_throttle
+        manual_steering = self.manual_steering
+        actuators = self.actuators
+
         # --- 1. 안전 로직 (Safety Logic) - 최우선 순위 ---
         # 안전 로직이 작동하면, 아래의 모드별 로직을 무시하고 안전한 값으로 제어합니다.
-        is_safe, final_throttle, final_steering = self._safety_check()
+        is_safe = self._safety_check(manual_throttle)
 
         # is_safe가 False이면, 안전 로직이 제어권을 가져간 것입니다.
         if not is_safe:
-            pass # final_throttle, final_steering에 이미 안전한 값이 할당됨
+            # 스로틀은 0으로 강제하고, 조향은 사용자의 입력을 유지 (회피 기동 가능)
+            final_throttle = 0.0
+            final_steering = manual_steering
         
         # --- 2. 모드별 로직 (Mode-Specific Logic) ---
         # 안전한 상황일 때만 모드별 로직을 실행합니다.
-        else:
-            if self.mode == 'MANUAL':
-                final_throttle = self.manual_throttle
-                final_steering = self.manual_steering
-
-            elif self.mode == 'AUTO':
-                # (TODO) 나중에 자율 주행 로직을 여기에 구현합니다.
-                # 현재는 정지 상태를 반환합니다.
-                auto_throttle, auto_steering = self._run_autonomy_logic()
-                final_throttle = auto_throttle
-                final_steering = auto_steering
-            
-            else: # 알 수 없는 모드일 경우 비상 정지
-                final_throttle = 0.0
-                final_steering = 0.0
+        elif mode == 'MANUAL':
+            final_throttle = manual_throttle
+            final_steering = manual_steering
+
+        elif mode == 'AUTO':
+            # (TODO) 나중에 자율 주행 로직을 여기에 구현합니다.
+            # 현재는 정지 상태를 반환합니다.
+            final_throttle, final_steering = self._run_autonomy_logic()
+        
+        else: # 알 수 없는 모드일 경우 비상 정지
+            final_throttle = 0.0
+            final_steering = 0.0
         
         # --- 3. 최종 제어 신호 전송 (Actuation) ---
-        self.actuators.set_throttle(final_throttle)
-        self.actuators.set_steering(final_steering)
+        actuators.set_throttle(final_throttle)
+        actuators.set_steering(final_steering)
 
         # --- 4. 로깅 (Logging) ---
-        if self.logger:
-            self.logger.log_data({
-                'timestamp': time.time(),
-                'type': 'control_output',
-                'mode': self.mode,
-                'final_throttle': final_throttle,
-                'final_steering': final_steering
-            })
-
-    def _safety_check(self):
+        # 모드 변경 또는 의미 있는 값 변화가 있을 때, 아니면 LOG_CONTROL_DECIMATE tick마다 한 번 기록
+        logger = self.logger
+        if logger:
+            self._ticks_since_log += 1
+            last_mode, last_throttle, last_steering = self._last_logged
+            if (mode != last_mode
+                    or self._ticks_since_log >= config.LOG_CONTROL_DECIMATE
+                    or abs(final_throttle - last_throttle) + abs(final_steering - last_steering)
+                        > config.LOG_CONTROL_EPS):
+                logger.log_data({
+                    'timestamp': time.time(),
+                    'type': 'control_output',
+                    'mode': mode,
+                    'final_throttle': final_throttle,
+                    'final_steering': final_steering
+                })
+                self._last_logged = (mode, final_throttle, final_steering)
+                self._ticks_since_log = 0
+
+    def _safety_check(self, manual_throttle):
         """
-        안전 상태를 확인하고, 위험 시 제어 값을 강제로 변경(override)합니다.
-        :return: (is_safe, throttle, steering) 튜플
-                 is_safe=False이면 throttle, steering은 강제된 안전 값입니다.
+        안전 상태를 확인합니다. 위험하면 execute_step이 제어 값을 강제로 변경(override)합니다.
+        :param manual_throttle: 현재 수동 스로틀 입력값
+        :return: 안전하면 True, 안전 로직이 제어권을 가져가야 하면 False
+                 (False일 때 스로틀은 0, 조향은 사용자 입력 유지)
         """
         
         # [안전 규칙 1: 라이다 기반 전방 장애물 충돌 방지]
-        # (예시) 전방 0.8미터 이내에 장애물이 있고, 사용자가 전진하려고 할 때 강제 정지
-        obstacle_distance = self._get_frontal_obstacle_distance(angle_range=30, max_dist_m=0.8)
-        
-        if obstacle_distance is not None: # 장애물이 범위 내에 감지됨
-            # 사용자가 전진(throttle > 0)을 시도하면
-            if self.manual_throttle > 0:
+        # 전방 SAFETY_FRONT_ANGLE_DEG 각도, SAFETY_FRONT_STOP_DIST_M 이내에 장애물이 있고,
+        # 사용자가 전진하려고 할 때 강제 정지
+        # (사용자가 전진(throttle > 0)을 시도할 때만 라이다 탐색을 수행)
+        if manual_throttle > 0:
+            obstacle_distance = self._get_frontal_obstacle_distance()
+            if obstacle_distance is not None: # 장애물이 범위 내에 감지됨
                 print(f"[Control][SAFETY] 전방 {obstacle_distance:.2f}m 장애물 감지! 전진 중단!")
-                # 스로틀은 0으로 강제하고, 조향은 사용자의 입력을 유지 (회피 기동 가능)
-                return False, 0.0, self.manual_steering
+                return False
 
         # 모든 안전 규칙을 통과하면, 안전하다고 판단하고 제어권을 넘김
-        return True, 0.0, 0.0
+        return True
 
-    def _get_frontal_obstacle_distance(self, angle_range, max_dist_m):
+    def _get_frontal_obstacle_distance(self):
         """
         라이다 데이터에서 전방 특정 각도 내 가장 가까운 장애물 거리를 찾습니다.
-        :param angle_range: 전방을 기준으로 탐색할 좌우 각도 (예: 30 -> -30도 ~ +30도)
-        :param max_dist_m: 장애물로 인식할 최대 거리 (미터)
+        (탐색 각도/거리는 config의 SAFETY_FRONT_* 값을 초기화 시 미리 계산한 것을 사용)
         :return: 가장 가까운 장애물 거리(m). 없으면 None.
         """
-        if not self.lidar_data:
+        lidar_data = self.lidar_data
+        cached_src, cached_result = self._obstacle_cache
+        if lidar_data is cached_src:
+            return cached_result
+        result = self._search_frontal_obstacle(*lidar_data)
+        self._obstacle_cache = (lidar_data, result)
+        return result
+
+    def _search_frontal_obstacle(self, angles, dists):
+        """
+        _get_frontal_obstacle_distance의 실제 탐색 부분입니다.
+        :param angles: 각도 배열[deg]
+        :param dists: 거리 배열[mm]
+        :return: 가장 가까운 장애물 거리(m). 없으면 None.
+        """
+        if dists.size == 0:
             return None
 
-        min_dist = float('inf')
-        found = False
-        max_dist_mm = max_dist_m * 1000
-
-        for angle, dist_mm in self.lidar_data:
-            # 전방 각도 범위 확인 (0~30도, 330~360도)
-            if (0 <= angle <= angle_range) or (360 - angle_range <= angle < 360):
-                # 유효한 거리(0 아님)이고, 설정된 최대 거리보다 가까우면
-                if 0 < dist_mm < max_dist_mm:
-                    if dist_mm < min_dist:
-                        min_dist = dist_mm
-                        found = True
-        
-        return min_dist / 1000.0 if found else None
+        angle_range = self._front_angle
+        max_dist_mm = self._front_max_mm
+
+        if _frontal_min is not None:
+            nearest = _frontal_min(angles, dists, angle_range, max_dist_mm)
+            return nearest / 1000.0 if nearest > 0.0 else None
+
+        # 측정점별 Python 루프 대신 numpy 마스크로 한 번에 계산
+        # 1) 유효한 거리(0 아님)이고, 설정된 최대 거리보다 가까운 점만 먼저 선택
+        #    (가까운 점은 보통 소수이므로 각도 비교는 이 점들에 대해서만 수행)
+        close = (dists > 0) & (dists < max_dist_mm)
+        if not close.any():
+            return None
+        a = angles[close]
+        d = dists[close]
+        # 2) 전방 각도 범위 확인 (0~30도, 330~360도)
+        front = ((a >= 0) & (a <= angle_range)) | ((a >= self._front_rear_start) & (a < 360))
+        near = d[front]
+
+        return float(near.min()) / 1000.0 if near.size else None
 
     def _run_autonomy_logic(self):
         """
@@ -0,0 +1,39 @@
+# input/ble_runtime.py
+"""
+BLE 센서들이 공유하는 단일 asyncio 이벤트 루프를 관리하는 모듈입니다.
+센서마다 스레드 + asyncio.run()을 따로 띄우지 않고,
+하나의 데몬 스레드에서 도는 루프에 코루틴을 제출하여 실행합니다.
+"""
+
+import threading
+import asyncio
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def _run_loop(loop):
+    """데몬 스레드에서 공유 이벤트 루프를 계속 실행합니다."""
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+def get_shared_loop():
+    """
+    공유 이벤트 루프를 반환합니다. (최초 호출 시 루프와 실행 스레드를 생성)
+    :return: 별도 스레드에서 실행 중인 asyncio 이벤트 루프
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_run_loop, args=(_loop,),
+                             name="ble-runtime", daemon=True).start()
+            print("[BLE] 공유 이벤트 루프 시작.")
+        return _loop
+
+def submit(coro):
+    """
+    코루틴을 공유 이벤트 루프에 제출합니다.
+    :param coro: 실행할 코루틴 객체
+    :return: concurrent.futures.Future (cancel()로 작업 취소 가능)
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_shared_loop())
@@ -0,0 +1,69 @@
+# input/ble_scanner.py
+"""
+여러 BLE 센서가 하나의 BleakScanner를 공유하도록 하는 모듈입니다.
+센서마다 find_device_by_name()으로 스캐너를 따로 돌리면 어댑터를 두고 경쟁하므로,
+스캔은 한 번만 실행하고 광고(advertisement)를 장치 이름별로 나누어 전달합니다.
+(모든 메서드는 ble_runtime의 공유 이벤트 루프 안에서 호출해야 합니다.)
+"""
+
+import asyncio
+from bleak import BleakScanner
+
+class SharedScanner:
+    """
+    대기 중인 요청이 있는 동안에만 스캔을 실행하고,
+    찾는 이름의 장치가 광고되면 해당 요청들을 즉시 깨웁니다.
+    """
+    def __init__(self):
+        self._waiters = {}     # 장치 이름 -> 대기 중인 Future 리스트
+        self._scanner = None   # 실행 중인 BleakScanner (없으면 None)
+
+    def _on_advertisement(self, device, adv_data):
+        """광고 수신 콜백: 이름이 일치하는 요청에 장치를 전달합니다."""
+        name = adv_data.local_name or device.name
+        futures = self._waiters.get(name)
+        if futures:
+            for fut in futures:
+                if not fut.done():
+                    fut.set_result(device)
+
+    async def find_device_by_name(self, name, timeout=10.0):
+        """
+        이름으로 장치를 찾습니다. (BleakScanner.find_device_by_name 대체)
+        :param name: 찾을 장치 이름
+        :param timeout: 최대 대기 시간 (초)
+        :return: BLEDevice 객체, 시간 내에 찾지 못하면 None
+        """
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(name, []).append(fut)
+        try:
+            if self._scanner is None:
+                self._scanner = BleakScanner(detection_callback=self._on_advertisement)
+                try:
+                    await self._scanner.start()
+                except Exception:
+                    self._scanner = None
+                    raise
+                print("[BLE] 공유 스캐너 시작.")
+            return await asyncio.wait_for(fut, timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            futures = self._waiters[name]
+            futures.remove(fut)
+            if not futures:
+                del self._waiters[name]
+            # 더 이상 기다리는 요청이 없으면 스캔 중지 (연결 중 라디오 점유 방지)
+            if not self._waiters and self._scanner is not None:
+                scanner, self._scanner = self._scanner, None
+                await scanner.stop()
+                print("[BLE] 공유 스캐너 중지.")
+
+_shared_scanner = None
+
+def get_shared_scanner():
+    """공유 스캐너를 반환합니다. (최초 호출 시 생성)"""
+    global _shared_scanner
+    if _shared_scanner is None:
+        _shared_scanner = SharedScanner()
+    return _shared_scanner
@@ -5,6 +5,8 @@ bleak 라이브러리와 asyncio를 사용합니다.
 """
 
 import time
+import struct
+from operator import mul
 import bleak
 import asyncio
 import sys # 사용자 입력 처리 개선을 위해 추가
@@ -13,6 +15,23 @@ import sys # 사용자 입력 처리 개선을 위해 추가
 # 1. DeviceModel 클래스 (BLE 연결, 통신, 데이터 파싱 담당)
 # -----------------------------------------------------------------
 
+# WitMotion 패킷 형식 (0x55 0x61 + 18바이트 데이터 + 2바이트 체크섬 = 22바이트)
+PACKET_HEADER = 0x55
+PACKET_TYPE = 0x61
+FULL_PACKET_LENGTH = 22
+PACKET_PREFIX = bytes((PACKET_HEADER, PACKET_TYPE))
+# 수신 버퍼 앞쪽의 처리 완료 구간이 이 크기를 넘으면 한 번에 잘라냄 (바이트)
+COMPACT_THRESHOLD = 4096
+# 처리하지 않은 바이트가 이보다 많이 쌓이면 스트림이 깨진 것으로 보고 버퍼를 전부 버림 (바이트)
+MAX_PENDING_BYTES = 4096
+
+# 데이터 부분(20바이트)의 int16 9개에 대응하는 deviceData 키 (가속도 xyz, 각속도 xyz, 각도 xyz)
+DATA_KEYS = ("AccX", "AccY", "AccZ", "AsX", "AsY", "AsZ", "AngX", "AngY", "AngZ")
+# 각 값의 환산 계수 (원시값 / 32768 * 범위)
+DATA_SCALES = (16 / 32768, 16 / 32768, 16 / 32768,
+               2000 / 32768, 2000 / 32768, 2000 / 32768,
+               180 / 32768, 180 / 32768, 180 / 32768)
+
 # 장치 인스턴스 Device instance
 class DeviceModel:
     # region UUID 상수 (WitMotion BLE)
@@ -30,6 +49,12 @@ class DeviceModel:
     _connect_event = None
     # endregion
 
+    # 데이터 부분(20바이트)의 int16 9개 (가속도 xyz, 각속도 xyz, 각도 xyz, little-endian)
+    _PKT = struct.Struct('<9h')
+    _SCALES = DATA_SCALES
+    # 명령 5바이트: 0xFF 0xAA + 레지스터/명령(1) + 값(2, little-endian)
+    _CMD = struct.Struct('<BBBH')
+
     def __init__(self, deviceName, mac, callback_method):
         print("[Model] 디바이스 모델 초기화 중...")
         self.deviceName = deviceName
@@ -39,7 +64,8 @@ class DeviceModel:
         self.isOpen = False
         self.callback_method = callback_method
         self.deviceData = {}
-        self.TempBytes = [] # 임시 바이트 배열 초기화
+        self.TempBytes = bytearray() # 수신 바이트 버퍼 (바이트마다 int 객체를 만들지 않음)
+        self._read_pos = 0           # TempBytes에서 아직 처리하지 않은 첫 바이트 위치
 
     # region 데이터 Getter/Setter
     def set(self, key, value):
@@ -117,70 +143,72 @@ class DeviceModel:
     # 시리얼 포트 데이터 처리  Serial port data processing
     def onDataReceived(self, sender, data):
         """BLE 알림 데이터 수신 시 호출되는 콜백."""
-        self.TempBytes.extend(data) 
+        buf = self.TempBytes
+        buf += data
+        n = len(buf)
+        # 처리한 바이트는 지우지 않고 읽기 위치(p)만 앞으로 옮김 (리스트 앞부분 삭제/이동 비용 제거)
+        p = self._read_pos
+
+        # 버퍼 크기 상한: 미처리 구간이 비정상적으로 길면 재동기화하지 않고 모두 버림
+        if n - p > MAX_PENDING_BYTES:
+            print(f"[Model] 수신 버퍼 초과 ({n - p}바이트). 버퍼를 비웁니다.")
+            buf.clear()
+            self._read_pos = 0
+            return
 
-        while self.TempBytes:
-            # 1. 시작 바이트 (0x55) 찾기
-            if self.TempBytes[0] != 0x55:
-                del self.TempBytes[0]
-                continue
+        while True:
+            # 1. 시작 바이트 (0x55) 찾기 (쓰레기 바이트를 한 번의 C 호출로 건너뜀)
+            p = buf.find(PACKET_HEADER, p)
+            if p < 0:
+                p = n # 시작 바이트가 없으면 전부 버림
+                break
             
             # 2. 충분한 바이트 확인 (최소 2바이트)
-            if len(self.TempBytes) < 2:
+            if n - p < 2:
                 break 
 
             # 3. 패킷 타입 확인 (0x55 0x61 - WitMotion 가속도/각속도/각도 패킷으로 가정)
-            if self.TempBytes[1] != 0x61:
-                del self.TempBytes[0] # 0x55 바이트를 버리고 다음 0x55를 찾는다
+            if buf[p + 1] != PACKET_TYPE:
+                p += 1 # 0x55 바이트를 버리고 다음 0x55를 find로 찾는다 (바이트 단위 반복 없음)
                 continue
 
-            # 4. 전체 패킷 길이 확인 (0x55 0x61 + 18바이트 데이터 + 2바이트 체크섬 = 22바이트)
-            FULL_PACKET_LENGTH = 22
-            
-            if len(self.TempBytes) < FULL_PACKET_LENGTH:
+            # 4. 전체 패킷 길이 확인
+            if n - p < FULL_PACKET_LENGTH:
                 break # 데이터 부족, 다음 알림 대기
 
-            # 5. 패킷 추출
-            packet = self.TempBytes[:FULL_PACKET_LENGTH]
+            # 5. 한 번의 알림에 패킷 여러 개가 붙어 오면, 연속된 패킷의 끝까지 이동
+            #    (장치 상태는 최신 값만 필요하므로 중간 패킷은 해석하지 않음)
+            q = p + FULL_PACKET_LENGTH
+            while n - q >= FULL_PACKET_LENGTH and buf.startswith(PACKET_PREFIX, q):
+                q += FULL_PACKET_LENGTH
 
-            # 6. 데이터 분석 (헤더 2바이트 제외, 20바이트 데이터)
-            self.processData(packet[2:])
+            # 6. 마지막 패킷만 데이터 분석 (헤더 2바이트 제외, 20바이트 데이터를 잘라내지 않고 위치로 전달)
+            self.processData(buf, q - FULL_PACKET_LENGTH + 2)
             
-            # 7. 처리된 패킷 제거
-            del self.TempBytes[:FULL_PACKET_LENGTH]
-
-    # 데이터 분석 data analysis (Bytes는 20바이트)
-    def processData(self, Bytes):
-        Ax = self.getSignInt16(Bytes[1] << 8 | Bytes[0]) / 32768 * 16
-        Ay = self.getSignInt16(Bytes[3] << 8 | Bytes[2]) / 32768 * 16
-        Az = self.getSignInt16(Bytes[5] << 8 | Bytes[4]) / 32768 * 16
-        Gx = self.getSignInt16(Bytes[7] << 8 | Bytes[6]) / 32768 * 2000
-        Gy = self.getSignInt16(Bytes[9] << 8 | Bytes[8]) / 32768 * 2000
-        Gz = self.getSignInt16(Bytes[11] << 8 | Bytes[10]) / 32768 * 2000
-        AngX = self.getSignInt16(Bytes[13] << 8 | Bytes[12]) / 32768 * 180
-        AngY = self.getSignInt16(Bytes[15] << 8 | Bytes[14]) / 32768 * 180
-        AngZ = self.getSignInt16(Bytes[17] << 8 | Bytes[16]) / 32768 * 180
+            # 7. 처리된 패킷 건너뛰기
+            p = q
+
+        # 다 처리했으면 비우고, 처리 완료 구간이 커졌을 때만 앞부분을 잘라냄
+        if p >= n:
+            buf.clear()
+            p = 0
+        elif p > COMPACT_THRESHOLD:
+            del buf[:p]
+            p = 0
+        self._read_pos = p
+
+    # 데이터 분석 data analysis (Bytes[offset:]부터 20바이트)
+    def processData(self, Bytes, offset=0):
+        # int16 9개를 한 번에 해석 (부호 처리는 struct의 'h' 형식이 담당)
+        vals = self._PKT.unpack_from(Bytes, offset)
         
-        self.set("AccX", round(Ax, 3))
-        self.set("AccY", round(Ay, 3))
-        self.set("AccZ", round(Az, 3))
-        self.set("AsX", round(Gx, 3))
-        self.set("AsY", round(Gy, 3))
-        self.set("AsZ", round(Gz, 3))
-        self.set("AngX", round(AngX, 3))
-        self.set("AngY", round(AngY, 3))
-        self.set("AngZ", round(AngZ, 3))
+        # 환산(map/mul)과 저장(dict.update)을 각각 한 번의 C 호출로 처리 (반올림 없이 원래 값 그대로)
+        # (표시용 자릿수 처리는 출력하는 쪽(updateData)에서 1초에 한 번만 수행)
+        self.deviceData.update(zip(DATA_KEYS, map(mul, vals, self._SCALES)))
         
         # 콜백 호출
         self.callback_method(self)
 
-    # int16 부호 있는 정수 얻기 Obtain int16 signed number
-    @staticmethod
-    def getSignInt16(num):
-        if num >= pow(2, 15):
-            num -= pow(2, 16)
-        return num
-
     # endregion
 
     # 시리얼 포트 데이터 전송 Sending serial port data
@@ -211,24 +239,25 @@ class DeviceModel:
     # 읽기 명령 캡슐화 Read instruction encapsulation
     @staticmethod
     def get_readBytes(regAddr: int) -> bytes:
-        tempBytes = [0xff, 0xaa, 0x27, regAddr, 0]
-        return bytes(tempBytes)
+        # 중간 리스트 없이 미리 컴파일한 Struct로 바로 bytes 생성
+        return DeviceModel._CMD.pack(0xff, 0xaa, 0x27, regAddr & 0xff)
 
     # 쓰기 명령 캡슐화 Write instruction encapsulation
     @staticmethod
     def get_writeBytes(regAddr: int, rValue: int) -> bytes:
-        tempBytes = [0xff, 0xaa, regAddr, rValue & 0xff, (rValue >> 8) & 0xff]
-        return bytes(tempBytes)
+        return DeviceModel._CMD.pack(0xff, 0xaa, regAddr & 0xff, rValue & 0xffff)
 
     # 잠금 해제 unlock
     async def unlock(self):
-        cmd = self.get_writeBytes(0x69, 0xb588)
-        await self.sendData(cmd)
+        await self.sendData(_UNLOCK_CMD)
 
     # 저장 save
     async def save(self):
-        cmd = self.get_writeBytes(0x00, 0x0000)
-        await self.sendData(cmd)
+        await self.sendData(_SAVE_CMD)
+
+# 고정 명령은 모듈 로드 시 한 번만 만들어 둠
+_UNLOCK_CMD = DeviceModel.get_writeBytes(0x69, 0xb588)
+_SAVE_CMD = DeviceModel.get_writeBytes(0x00, 0x0000)
 
 
 # -----------------------------------------------------------------
@@ -237,13 +266,32 @@ class DeviceModel:
 
 # Global 변수
 devices = []
-last_print_time = time.time() # 데이터 출력 주기를 제어하기 위한 변수
+_monotonic = time.monotonic # 알림마다 호출되므로 모듈 속성 조회 없이 바로 호출
+last_print_time = _monotonic() # 데이터 출력 주기를 제어하기 위한 변수 (monotonic 기준)
+print_q = None # 출력할 줄을 printer 태스크로 넘기는 asyncio.Queue (main에서 생성, 없으면 바로 출력)
+
+# 출력 전용 태스크: 알림 콜백 대신 stdout 쓰기를 담당 (콜백이 print에 묶여 이벤트 루프를 막지 않도록)
+async def printer(q):
+    while True:
+        line = await q.get()
+        print(line)
+
+def _emit(line):
+    """출력할 줄을 printer 태스크에 넘깁니다. (큐가 가득 차면 해당 줄은 버림)"""
+    if print_q is None:
+        print(line)
+        return
+    try:
+        print_q.put_nowait(line)
+    except asyncio.QueueFull:
+        pass
 
 # 데이터 업데이트 시 호출될 함수 This method will be called when data is updated
 def updateData(DeviceModel):
     global last_print_time
     
-    current_time = time.time()
+    # 주기 판단에는 벽시계 대신 monotonic 시계 사용 (시각 문자열은 출력할 때만 생성)
+    current_time = _monotonic()
     
     # 1초에 한 번만 출력하도록 제어
     if current_time - last_print_time >= 1.0:
@@ -256,9 +304,9 @@ def updateData(DeviceModel):
             ang_x = DeviceModel.get("AngX")
             ang_z = DeviceModel.get("AngZ") # Yaw
             
-            print(f"[{time.strftime('%H:%M:%S')}] A:({acc_x:.2f}, {acc_y:.2f}) / Angle(Roll/Yaw): ({ang_x:.2f}, {ang_z:.2f}) deg")
+            _emit(f"[{time.strftime('%H:%M:%S')}] A:({acc_x:.2f}, {acc_y:.2f}) / Angle(Roll/Yaw): ({ang_x:.2f}, {ang_z:.2f}) deg")
         except AttributeError:
-            print(f"Data Update: {DeviceModel.deviceData}")
+            _emit(f"Data Update: {DeviceModel.deviceData}")
         except TypeError:
              # 데이터가 아직 초기화되지 않은 경우
              pass
@@ -266,12 +314,29 @@ def updateData(DeviceModel):
 
 # 스캔 및 연결을 관리하는 메인 비동기 함수
 async def main():
-    global devices
+    global devices, print_q
     
     # 1. 스캔 로직 실행
     print("Bluetooth 장치 스캔 중......")
     try:
-        devices = await bleak.BleakScanner.discover(timeout=5.0)
+        # 5초를 다 기다리지 않고, WT 장치가 처음 광고되는 즉시 스캔을 끝냄
+        found = {}  # 주소 -> BLEDevice (광고가 반복되어도 장치당 하나)
+        first_match = asyncio.Event()
+
+        def on_advertisement(device, adv_data):
+            found[device.address] = device
+            if device.name is not None and "WT" in device.name:
+                first_match.set()
+
+        scanner = bleak.BleakScanner(detection_callback=on_advertisement)
+        await scanner.start()
+        try:
+            await asyncio.wait_for(first_match.wait(), timeout=5.0)
+        except asyncio.TimeoutError:
+            pass # 시간 내에 WT 장치가 없으면 그때까지 찾은 장치로 진행
+        finally:
+            await scanner.stop()
+        devices = list(found.values())
         print("스캔 종료.")
         
         # WitMotion 장치 필터링 및 출력
@@ -331,8 +396,15 @@ async def main():
             updateData
         )
         
-        # openDevice 함수 실행 (연결 루프를 비동기로 시작)
-        await device.openDevice()
+        # 데이터 출력은 별도 태스크에서 처리 (알림 콜백은 큐에 넣고 바로 반환)
+        print_q = asyncio.Queue(maxsize=4)
+        printer_task = asyncio.create_task(printer(print_q))
+        try:
+            # openDevice 함수 실행 (연결 루프를 비동기로 시작)
+            await device.openDevice()
+        finally:
+            printer_task.cancel()
+            print_q = None
         
     else:
         print("연결할 장치가 선택되지 않았습니다. 프로그램 종료.")
@@ -7,7 +7,9 @@ depthai 라이브러리를 사용하며, 별도의 스레드에서 동작합니
 """
 
 import threading
+import queue
 import time
+from datetime import timedelta
 import cv2
 import depthai as dai
 import numpy as np
@@ -19,6 +21,19 @@ class DepthCameraSensor(threading.Thread):
     OAK-D Lite 카메라를 별도 스레드에서 실행하여
     RGB 이미지와 Depth 맵을 지속적으로 수신합니다.
     """
+    # 로그 이미지 JPEG 인코딩 옵션 (매 저장마다 새로 만들지 않도록 클래스에 고정)
+    _JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 85, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+
+    # 구성이 끝난 DepthAI 파이프라인 (클래스 공용 캐시)
+    # 재초기화/재연결 시 파이프라인 구성 코드를 다시 실행하지 않고 재사용합니다.
+    _cached_pipeline = None
+
+    # 새 프레임 대기 최대 시간. 이 시간마다 running 플래그를 다시 확인합니다.
+    _QUEUE_WAIT = timedelta(milliseconds=100)
+
+    # 이미지 저장 대기열 크기
+    _LOG_Q_SIZE = 4
+
     def __init__(self, logger=None):
         """
         DepthCameraSensor 스레드를 초기화합니다.
@@ -27,27 +42,59 @@ class DepthCameraSensor(threading.Thread):
         super().__init__()
         self.daemon = True
 
-        self.latest_rgb_frame = None    # 가장 최근의 RGB 프레임 (OpenCV Mat 형식)
-        self.latest_depth_frame = None # 가장 최근의 Depth 프레임 (raw data)
+        # 최신 프레임 쌍: (컬러 프레임(카메라 원본 NV12, BGR 변환 전), Depth 프레임(raw data))
+        # 캡처 스레드는 새 튜플을 만들어 참조 대입 한 번으로 공개하고, 읽는 쪽은 튜플을 한 번만 읽습니다.
+        # (공개된 튜플은 수정하지 않으므로 락 없이도 항상 같은 시점의 RGB/Depth 쌍을 얻음)
+        self._latest = (None, None)
+        self.frame_seq = 0  # 새 프레임이 공개될 때마다 1씩 증가 (같은 프레임 재처리 여부 판단용)
+        # RGB/Depth 각각의 프레임 번호 (해당 프레임이 새로 들어왔을 때만 증가)
+        self.rgb_version = 0
+        self.depth_version = 0
+        self._bgr_cache = None  # (NV12 프레임, 변환된 BGR 프레임) - 새 프레임이 올 때까지 재사용
+        self._frame_evt = threading.Event()  # 새 프레임 공개 시 set (wait_for_frame에서 대기)
         self.running = True
         self.logger = logger
         self.pipeline = None
         self.device = None
         
         self.frame_count = 0
-        self.last_log_time = 0
+        # 다음 이미지 로깅 시점 (monotonic 기준 정수 ns, 벽시계 변경에 영향받지 않음)
+        self._log_interval_ns = int(1e9 / config.LOG_IMAGE_SAVE_HZ)
+        self._next_log_deadline_ns = 0
+        # 로그 이미지 경로 접두사 (저장할 때마다 os.path.join 하지 않도록 미리 계산)
+        self._log_prefix = config.LOG_IMAGE_DIR_PATH.rstrip(os.sep) + os.sep
+
+        # 이미지 저장(JPEG 인코딩 + 파일 쓰기)은 별도 스레드에서 처리하여
+        # 캡처 루프가 인코딩 시간만큼 멈추지 않도록 합니다.
+        # 큐가 가득 차면 해당 프레임 저장은 건너뜁니다. (캡처 루프를 막지 않음)
+        self._log_q = queue.Queue(maxsize=self._LOG_Q_SIZE)
+        # 저장할 프레임을 복사해 둘 미리 할당된 버퍼 링 (첫 프레임 크기에 맞춰 생성)
+        # 큐에 들어 있는 프레임(최대 _LOG_Q_SIZE - 1개, 가득 차면 넣지 않음)과
+        # writer가 처리 중인 1개를 덮어쓰지 않도록 _LOG_Q_SIZE + 1칸을 돌려 씀
+        self._log_ring = None
+        self._log_ring_pos = 0
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
         
         print("[Camera] 뎁스 카메라 스레드 초기화 완료.")
 
     def _create_pipeline(self):
-        """DepthAI 파이프라인을 생성하고 구성합니다."""
+        """DepthAI 파이프라인을 생성하고 구성합니다. (이미 구성된 파이프라인이 있으면 재사용)"""
+        cls = type(self)
+        if cls._cached_pipeline is not None:
+            self.pipeline = cls._cached_pipeline
+            print("[Camera] 캐시된 DepthAI 파이프라인 재사용.")
+            return
+
         pipeline = dai.Pipeline()
 
         # 1. 컬러 카메라 노드 생성
+        # (video 출력은 NV12 형식. BGR 변환은 호스트에서 실제로 필요할 때만 수행)
         cam_rgb = pipeline.create(dai.node.ColorCamera)
-        cam_rgb.setPreviewSize(config.OAKD_RGB_RESOLUTION)
+        cam_rgb.setVideoSize(*config.OAKD_RGB_RESOLUTION)
         cam_rgb.setBoardSocket(dai.CameraBoardSocket.RGB)
         cam_rgb.setResolution(dai.ColorCameraProperties.SensorResolution.THE_1080_P)
+        cam_rgb.setColorOrder(dai.ColorCameraProperties.ColorOrder.BGR)
         cam_rgb.setInterleaved(False)
         cam_rgb.setFps(config.OAKD_RGB_FPS)
 
@@ -68,25 +115,25 @@ class DepthCameraSensor(threading.Thread):
         stereo.setSubpixel(True)
         stereo.setExtendedDisparity(False) 
         stereo.setLeftRightCheck(True)
-        stereo.initialConfig.postProcessing.median = dai.MedianFilter.KERNEL_7x7
-
+        stereo.initialConfig.setMedianFilter(dai.MedianFilter.KERNEL_7x7)
+        # 장치에서 Depth 해상도를 축소하여 전송 (subpixel 정밀도는 유지)
+        stereo.setOutputSize(*config.OAKD_DEPTH_OUTPUT_SIZE)
 
-        
-        xout_rgb = pipeline.create(dai.node.out)
+        # 3. 출력(XLinkOut) 노드 생성
+        xout_rgb = pipeline.create(dai.node.XLinkOut)
         xout_rgb.setStreamName("rgb")
         # Depth 출력 노드
-        xout_depth = pipeline.create(dai.node.DataOutput)
+        xout_depth = pipeline.create(dai.node.XLinkOut)
         xout_depth.setStreamName("depth")
 
-
-
         # 4. 노드 연결
-        cam_rgb.preview.link(xout_rgb.input)
+        cam_rgb.video.link(xout_rgb.input)
         mono_left.out.link(stereo.left)
         mono_right.out.link(stereo.right)
         stereo.depth.link(xout_depth.input)
         
         self.pipeline = pipeline
+        cls._cached_pipeline = pipeline
         print("[Camera] DepthAI 파이프라인 생성 완료. (RGB-Depth 정렬 활성화)")
 
     def run(self):
@@ -103,18 +150,38 @@ class DepthCameraSensor(threading.Thread):
                 q_rgb = device.getOutputQueue(name="rgb", maxSize=4, blocking=False)
                 q_depth = device.getOutputQueue(name="depth", maxSize=4, blocking=False)
 
+                queue_names = ["rgb", "depth"]
+                wait_timeout = self._QUEUE_WAIT
+
                 while self.running:
-                    # 각 큐에서 데이터 가져오기 (non-blocking)
+                    # 두 큐 중 하나에 프레임이 들어올 때까지 장치 이벤트로 대기
+                    # (tryGet만 반복하면 프레임 사이에 CPU 코어 하나를 계속 점유함)
+                    if not device.getQueueEvent(queue_names, wait_timeout):
+                        continue # 시간 초과: running 플래그만 재확인
+
+                    # 각 큐에서 데이터 가져오기 (non-blocking, 도착한 것만)
                     in_rgb = q_rgb.tryGet()
                     in_depth = q_depth.tryGet()
 
-                    if in_rgb is not None:
-                        # OpenCV에서 사용할 수 있는 BGR 형식으로 변환
-                        self.latest_rgb_frame = in_rgb.getCvFrame()
-
-                    if in_depth is not None:
+                    if in_rgb is not None or in_depth is not None:
+                        rgb, depth = self._latest
+                        # 프레임은 복사하지 않고 수신한 메시지 버퍼를 그대로 참조 (copy=False)
+                        # (메시지마다 버퍼가 새로 오므로, 공개한 배열을 재사용 버퍼에 덮어쓰지 않아도 됨
+                        #  -> 메인 루프/표시 스레드가 이전 프레임을 쥐고 있어도 내용이 바뀌지 않음)
+                        # NV12 원본을 (높이*1.5, 너비) 형태로 보관 (새 프레임이 없으면 이전 것 유지)
+                        if in_rgb is not None:
+                            rgb = in_rgb.getFrame(copy=False).reshape(
+                                in_rgb.getHeight() * 3 // 2, in_rgb.getWidth())
                         # 뎁스 프레임(거리 정보, uint16, mm단위)을 가져옴
-                        self.latest_depth_frame = in_depth.getFrame()
+                        if in_depth is not None:
+                            depth = in_depth.getFrame(copy=False)
+                        self._latest = (rgb, depth)  # 단일 속성 대입으로 새 프레임 쌍 공개
+                        self.frame_seq += 1
+                        if in_rgb is not None:
+                            self.rgb_version += 1
+                        if in_depth is not None:
+                            self.depth_version += 1
+                        self._frame_evt.set()
 
                     # 데이터 로깅 처리
                     self._log_data()
@@ -128,20 +195,56 @@ class DepthCameraSensor(threading.Thread):
 
     def _log_data(self):
         """설정된 주기에 맞춰 이미지와 관련 데이터를 로깅합니다."""
-        if not self.logger or self.latest_rgb_frame is None:
+        if not self.logger:
+            return
+        now_ns = time.monotonic_ns()
+        if now_ns < self._next_log_deadline_ns:
+            return
+        nv12 = self._latest[0]
+        if nv12 is None:
             return
+        self._next_log_deadline_ns = now_ns + self._log_interval_ns
+
+        # 이미지 저장(파일 이름 생성, BGR 변환, JPEG 인코딩 포함)은 writer 스레드에 위임
+        # 대기열이 가득 차 있으면 복사도 하지 않고 이번 저장은 건너뜀 (생산자는 이 스레드 하나뿐)
+        if self._log_q.full():
+            return
+        # 장치 버퍼를 참조하지 않도록 미리 할당한 링 버퍼 칸에 복사 (매번 새 배열을 할당하지 않음)
+        ring = self._log_ring
+        if ring is None or ring[0].shape != nv12.shape:
+            ring = self._log_ring = [np.empty_like(nv12) for _ in range(self._LOG_Q_SIZE + 1)]
+        pos = self._log_ring_pos
+        slot = ring[pos]
+        np.copyto(slot, nv12)
+        self._log_ring_pos = (pos + 1) % len(ring)
+        # (파일 이름용 시각은 벽시계 사용)
+        self._log_q.put_nowait((time.time(), self.frame_count, slot))
+        self.frame_count += 1
+
+    def _writer_loop(self):
+        """큐에 들어온 프레임을 JPEG로 저장하고 CSV 로그를 남기는 writer 스레드 루프"""
+        # 종료 신호 후에도 큐에 남은 프레임은 모두 저장
+        while self.running or not self._log_q.empty():
+            try:
+                now, count, nv12 = self._log_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
 
-        now = time.time()
-        if (now - self.last_log_time) >= (1.0 / config.LOG_IMAGE_SAVE_HZ):
-            self.last_log_time = now
-            
             # 파일 이름 생성 (타임스탬프_프레임카운트.jpg)
-            img_filename = f"{now:.0f}_{self.frame_count}.jpg"
-            img_filepath = os.path.join(config.LOG_IMAGE_DIR_PATH, img_filename)
+            img_filename = f"{int(now)}_{count}.jpg"
+            img_filepath = self._log_prefix + img_filename
+            frame = cv2.cvtColor(nv12, cv2.COLOR_YUV2BGR_NV12)
 
-            # 이미지 저장
-            cv2.imwrite(img_filepath, self.latest_rgb_frame)
-            self.frame_count += 1
+            # 이미지 저장 (메모리에서 JPEG 인코딩 후 fd에 직접 기록)
+            ok, enc = cv2.imencode('.jpg', frame, self._JPEG_PARAMS)
+            if not ok:
+                print(f"[Camera] 이미지 인코딩 실패: {img_filepath}")
+                continue
+            try:
+                self._write_file(img_filepath, enc)
+            except OSError as e:
+                print(f"[Camera] 이미지 저장 실패: {img_filepath} ({e})")
+                continue
 
             # CSV 파일에 기록할 데이터 전송
             self.logger.log_data({
@@ -150,12 +253,60 @@ class DepthCameraSensor(threading.Thread):
                 'image_file': img_filename
             })
 
+    @staticmethod
+    def _write_file(path, data):
+        """인코딩된 바이트 버퍼를 파일로 기록합니다. (fd를 직접 열고 닫음)"""
+        view = memoryview(data).cast('B')
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+
+    def _to_bgr(self, nv12):
+        """NV12 프레임을 BGR로 변환합니다. (같은 프레임은 한 번만 변환하고 결과를 재사용)"""
+        if nv12 is None:
+            return None
+        cache = self._bgr_cache
+        if cache is not None and cache[0] is nv12:
+            return cache[1]
+        bgr = cv2.cvtColor(nv12, cv2.COLOR_YUV2BGR_NV12)
+        self._bgr_cache = (nv12, bgr)
+        return bgr
+
+    @property
+    def rgb_bgr(self):
+        """가장 최근의 컬러 프레임을 BGR(OpenCV Mat 형식)로 반환 (요청 시 변환)"""
+        return self._to_bgr(self._latest[0])
+
+    @property
+    def latest_rgb_frame(self):
+        """가장 최근의 RGB 프레임 (OpenCV Mat 형식)"""
+        return self.rgb_bgr
+
+    def wait_for_frame(self, timeout=None):
+        """
+        새 프레임이 공개될 때까지 최대 timeout초 동안 대기합니다.
+        :return: 새 프레임이 도착했으면 True, 시간 초과 시 False
+        """
+        got = self._frame_evt.wait(timeout)
+        self._frame_evt.clear()
+        return got
+
+    @property
+    def latest_depth_frame(self):
+        """가장 최근의 Depth 프레임 (raw data)"""
+        return self._latest[1]
+
     def get_data(self):
         """
         메인 스레드에서 가장 최근의 프레임 데이터를 가져갈 때 사용하는 함수.
         :return: (RGB 프레임, Depth 프레임) 튜플
         """
-        return self.latest_rgb_frame, self.latest_depth_frame
+        rgb, depth = self._latest  # 한 번만 읽어 일관된 쌍을 얻음
+        return self._to_bgr(rgb), depth
 
     # --- [추가된 코드] ---
     def get_rgb_frame(self):
@@ -177,3 +328,78 @@ class DepthCameraSensor(threading.Thread):
         """스레드를 안전하게 종료시키기 위해 호출하는 함수"""
         print("[Camera] 종료 신호 수신.")
         self.running = False
+
+# -----------------------------------------------
+# (참고) 이 파일 단독으로 카메라 센서만 테스트할 때 사용
+# -----------------------------------------------
+if __name__ == '__main__':
+    # 터미널에서 프로젝트 루트 폴더로 이동한 뒤 실행:
+    # python -m input.depth_camera_sensor
+    
+    # (참고) 로깅 테스트를 위해 임시 Logger 클래스 생성
+    class TmpLogger:
+        def log_data(self, data):
+            print(f"LOG: {data}")
+    
+    if not os.path.exists(config.LOG_IMAGE_DIR_PATH):
+        os.makedirs(config.LOG_IMAGE_DIR_PATH)
+
+    print("뎁스 카메라 센서 단독 테스트 시작...")
+    cam_sensor = DepthCameraSensor(logger=TmpLogger())
+    cam_sensor.start()
+
+    # 화면 표시는 DEPTH_DEBUG_SHOW=1 일 때만 수행 (헤드리스 환경에서는 시각화/GUI 호출 생략)
+    show = os.environ.get("DEPTH_DEBUG_SHOW") == "1"
+
+    # 뎁스 시각화용 버퍼 (첫 프레임 크기에 맞춰 한 번만 할당하고 매 프레임 재사용)
+    depth_u8 = None
+    depth_color = None
+    last_report = 0.0
+
+    try:
+        while True:
+            # 새 프레임이 도착할 때 바로 깨어남 (고정 sleep 대기 없음)
+            if not cam_sensor.wait_for_frame(0.1):
+                if show and cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+                continue
+
+            # --- [수정] 새 메소드를 사용하여 각각 데이터 요청 ---
+            depth_frame = cam_sensor.get_depth_frame()
+
+            if not show:
+                # 헤드리스: 1초마다 수신 상태만 출력
+                now = time.time()
+                if now - last_report >= 1.0:
+                    last_report = now
+                    shape = None if depth_frame is None else depth_frame.shape
+                    print(f"프레임 수신 중... Depth shape: {shape}")
+                continue
+
+            rgb_frame = cam_sensor.get_rgb_frame()
+            
+            # 받은 프레임이 있으면 화면에 표시
+            if rgb_frame is not None:
+                cv2.imshow("RGB Test", rgb_frame)
+
+            if depth_frame is not None:
+                if depth_u8 is None or depth_u8.shape != depth_frame.shape:
+                    depth_u8 = np.empty(depth_frame.shape, dtype=np.uint8)
+                    depth_color = np.empty(depth_frame.shape + (3,), dtype=np.uint8)
+                # 뎁스 프레임 시각화 (고정 배율 0.03, 255에서 포화) - 미리 할당한 버퍼에 직접 기록
+                cv2.convertScaleAbs(depth_frame, dst=depth_u8, alpha=0.03)
+                cv2.applyColorMap(depth_u8, cv2.COLORMAP_JET, dst=depth_color)
+                cv2.imshow("Depth Test", depth_color)
+
+            # 1ms 대기, 'q' 누르면 종료
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+    except KeyboardInterrupt:
+        print("\n사용자 요청으로 테스트 종료.")
+    finally:
+        cam_sensor.stop()
+        cam_sensor.join()
+        if show:
+            cv2.destroyAllWindows()
+        print("뎁스 카메라 센서 테스트 완료.")
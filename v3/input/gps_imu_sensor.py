@@ -8,8 +8,39 @@ import threading
 import asyncio
 import time
 import math
-from bleak import BleakScanner, BleakClient
+import struct
+from bleak import BleakClient
 import config
+from .ble_runtime import submit
+from .ble_scanner import get_shared_scanner
+
+# WitMotion 0x53(각도) 패킷: 헤더 2바이트(0x55, 0x53)를 건너뛰고 Roll/Pitch/Yaw 리틀 엔디안 int16 3개
+_ANGLE_PKT = struct.Struct('<xxhhh')
+_angle_unpack_from = _ANGLE_PKT.unpack_from
+_ANGLE_SCALE = 180.0 / 32768.0  # 원시 int16 -> deg
+
+def _parse_angle_packet(data):
+    """
+    0x53 각도 패킷의 체크섬을 확인하고 각도를 변환합니다.
+    :return: (roll, pitch, yaw) [deg], 체크섬 불일치 시 None
+    """
+    # 체크섬: 앞 10바이트 합의 하위 8비트 (memoryview로 슬라이스 복사 없이 합산)
+    if (sum(memoryview(data)[:10]) & 0xFF) != data[10]:
+        return None
+    # 패킷 시작부터 한 번에 변환 (헤더는 Struct가 건너뜀)
+    roll_raw, pitch_raw, yaw_raw = _angle_unpack_from(data)
+    return roll_raw * _ANGLE_SCALE, pitch_raw * _ANGLE_SCALE, yaw_raw * _ANGLE_SCALE
+
+# 로그 묶음 전송 조건: 샘플 수 또는 경과 시간(초) 중 먼저 도달하는 쪽
+_LOG_BATCH_SIZE = 16
+_LOG_BATCH_INTERVAL = 0.1
+_LOG_FIELDS = ('timestamp', 'yaw', 'pitch', 'roll')
+
+_now = time.time  # 수신 콜백에서 모듈 속성 조회 없이 호출
+
+# BLE 재연결 대기 시간 범위 (초, 지수 증가)
+_BACKOFF_MIN = 1.0
+_BACKOFF_MAX = 8.0
 
 class GpsImuSensor:
     """
@@ -36,51 +67,97 @@ class GpsImuSensor:
         # --- 개선 사항: 보정을 위한 내부 변수 ---
         self.raw_yaw = 0.0     # 센서에서 수신한 원본 Yaw 값
         self.yaw_offset = 0.0  # 보정량 (Offset)
+        # 수신 콜백에서 매번 더하지 않도록 (offset + 180)을 미리 계산해 둠 (offset 변경 시 갱신)
+        self._yaw_bias = self.yaw_offset + 180.0
         # --- 개선 사항 끝 ---
 
+        # 장치 이름/UUID는 생성 시 한 번만 읽어 둠
+        # (config.py에는 WT901BLECL 설정이 GPS_* 이름으로 있으므로 IMU_*가 없으면 그 값을 사용)
+        self._device_name = getattr(config, 'IMU_DEVICE_NAME', config.GPS_DEVICE_NAME)
+        self._char_uuid = getattr(config, 'IMU_DATA_CHAR_UUID', config.GPS_DATA_CHAR_UUID)
+
         self.running = True
         self.logger = logger
-        self.thread = threading.Thread(target=self._run_async_loop, daemon=True)
-        print("[IMU] IMU 스레드 (Yaw 보정 기능 탑재) 초기화 완료.")
 
-    def _run_async_loop(self):
-        """asyncio 이벤트 루프를 이 스레드에서 실행합니다."""
-        try:
-            asyncio.run(self._ble_communication_loop())
-        except Exception as e:
+        # 로그 샘플 (timestamp, yaw, pitch, roll) 튜플을 모아 한 번에 로거로 전달
+        # (수신 콜백과 flush 모두 공유 이벤트 루프 스레드에서만 실행되므로 Lock 불필요)
+        self._log_buf = []
+        self._last_flush = 0.0
+        self.log_drops = 0  # 로거 큐가 가득 차서 버려진 샘플 수
+
+        # 공유 BLE 이벤트 루프에 제출된 통신 작업 (stop() 시 cancel)
+        self._future = None
+        print("[IMU] IMU 센서 (Yaw 보정 기능 탑재) 초기화 완료.")
+
+    def _on_loop_done(self, future):
+        """통신 작업이 종료되었을 때 예외를 출력합니다."""
+        if future.cancelled():
+            return
+        e = future.exception()
+        if e is not None:
             print(f"[IMU] 비동기 루프에서 에러 발생: {e}")
 
+    def _flush_log(self, now):
+        """
+        모아둔 로그 샘플을 로거에 한 번에 넘깁니다.
+        (BLE 수신 콜백에서 호출되므로 블로킹 없이 큐에 넣기만 하고,
+         CSV 기록은 DataLogger 스레드가 담당합니다. 큐가 가득 차면 대기하지 않고 버림)
+        """
+        batch, self._log_buf = self._log_buf, []
+        self._last_flush = now
+        if not self.logger.log_batch('imu_data', _LOG_FIELDS, batch):
+            self.log_drops += len(batch)
+
     async def _ble_communication_loop(self):
-        """실제 BLE 통신이 이루어지는 비동기 루프입니다."""
+        """실제 BLE 통신이 이루어지는 비동기 루프입니다. (공유 이벤트 루프에서 실행)"""
+        try:
+            await self._ble_session_loop()
+        finally:
+            # 종료(취소) 시 남은 로그 샘플 전송
+            if self.logger and self._log_buf:
+                self._flush_log(time.time())
+
+    async def _ble_session_loop(self):
+        """장치 스캔/연결/재연결을 반복합니다."""
+        # 재연결 대기 시간: 실패할 때마다 1 -> 2 -> 4 -> 8초 (최대 8초), 연결 성공 시 초기화
+        backoff = _BACKOFF_MIN
+
         while self.running:
             device = None
             try:
-                print(f"[IMU] 장치 스캔 중... (이름: {config.IMU_DEVICE_NAME})") 
-                device = await BleakScanner.find_device_by_name(
-                    config.IMU_DEVICE_NAME, timeout=10.0
+                print(f"[IMU] 장치 스캔 중... (이름: {self._device_name})") 
+                device = await get_shared_scanner().find_device_by_name(
+                    self._device_name, timeout=10.0
                 )
                 if not device:
-                    print("[IMU] 장치를 찾을 수 없습니다. 5초 후 재시도합니다.")
-                    await asyncio.sleep(5)
+                    print(f"[IMU] 장치를 찾을 수 없습니다. {backoff:.0f}초 후 재시도합니다.")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, _BACKOFF_MAX)
                     continue
 
                 print(f"[IMU] 장치 발견. 연결 시도: {device.address}")
-                async with BleakClient(device) as client:
+                # 연결이 끊기면 bleak이 콜백을 호출하여 이벤트를 설정 (폴링 없이 대기)
+                disconnected = asyncio.Event()
+                async with BleakClient(
+                    device, disconnected_callback=lambda _client: disconnected.set()
+                ) as client:
                     if client.is_connected:
                         print("[IMU] BLE 장치 연결 성공.")
+                        backoff = _BACKOFF_MIN
                         await client.start_notify(
-                            config.IMU_DATA_CHAR_UUID, self._notification_handler
+                            self._char_uuid, self._notification_handler
                         )
                         print("[IMU] 데이터 수신 대기 중...")
-                        while self.running and client.is_connected:
-                            await asyncio.sleep(1.0)
+                        # 연결이 끊길 때까지 대기 (stop() 시 작업 취소로 즉시 빠져나감)
+                        await disconnected.wait()
                 print("[IMU] 장치 연결 끊김.")
 
             except Exception as e:
                 print(f"[IMU] 통신 에러: {e}")
                 if self.running:
-                    print("[IMU] 5초 후 재연결을 시도합니다.")
-                    await asyncio.sleep(5)
+                    print(f"[IMU] {backoff:.0f}초 후 재연결을 시도합니다.")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, _BACKOFF_MAX)
 
     def _notification_handler(self, sender, data: bytearray):
         """BLE 장치로부터 데이터(notification)가 수신될 때마다 호출되는 콜백 함수."""
@@ -88,63 +165,62 @@ class GpsImuSensor:
             if len(data) != 11 or data[0] != 0x55:
                 return
             
-            checksum = sum(data[0:10]) & 0xFF
-            if checksum != data[10]:
-                return
-
             tag = data[1]
             if tag == 0x53: # 각도 데이터
-                roll_raw = int.from_bytes(data[2:4], 'little', signed=True)
-                pitch_raw = int.from_bytes(data[4:6], 'little', signed=True)
-                yaw_raw_int = int.from_bytes(data[6:8], 'little', signed=True)
+                # 체크섬 확인 + 각도 변환
+                angles = _parse_angle_packet(data)
+                if angles is None:
+                    return
+                roll, pitch, yaw = angles
 
-                roll = roll_raw / 32768.0 * 180.0
-                pitch = pitch_raw / 32768.0 * 180.0
-                yaw = yaw_raw_int / 32768.0 * 180.0
-                
-                now = time.time()
+                now = _now()
 
-                # --- 개선 사항: Lock을 잡고 데이터 업데이트 ---
+                # 보정(Offset) 적용 및 새 데이터 생성은 Lock 밖에서 수행
+                # -180 ~ +180 범위를 넘지 않도록 wrap-around 처리
+                corrected_yaw = (yaw + self._yaw_bias) % 360.0 - 180.0
+                new_data = {
+                    "timestamp": now,
+                    "yaw": corrected_yaw, # 보정된 Yaw
+                    "pitch": pitch,
+                    "roll": roll
+                }
+
+                # --- 개선 사항: Lock 안에서는 참조 교체만 수행 ---
+                # (공개된 dict는 이후 수정하지 않으므로 get_data에서 복사할 필요 없음)
                 with self.data_lock:
-                    # 1. 센서 원본 값(raw) 저장
                     self.raw_yaw = yaw
-                    
-                    # 2. 보정(Offset) 적용
-                    # -180 ~ +180 범위를 넘지 않도록 wrap-around 처리
-                    corrected_yaw = (self.raw_yaw + self.yaw_offset + 180) % 360 - 180
-
-                    # 3. 외부로 전달될 최종 데이터 업데이트
-                    self.latest_data = {
-                        "timestamp": now,
-                        "yaw": corrected_yaw, # 보정된 Yaw
-                        "pitch": pitch,
-                        "roll": roll
-                    }
+                    self.latest_data = new_data
                 # --- 개선 사항 끝 ---
 
-                # 로거가 있으면 최종 데이터 전송
+                # 로거가 있으면 샘플을 모아두었다가 묶음으로 전송
                 if self.logger:
-                    log_entry = {'type': 'imu_data', **self.latest_data}
-                    self.logger.log_data(log_entry)
+                    buf = self._log_buf
+                    buf.append((now, corrected_yaw, pitch, roll))
+                    if len(buf) >= _LOG_BATCH_SIZE or now - self._last_flush > _LOG_BATCH_INTERVAL:
+                        self._flush_log(now)
 
         except Exception as e:
             print(f"[IMU] 데이터 파싱 에러: {e}, 받은 데이터: {data.hex()}")
 
     def start(self):
         self.running = True
-        self.thread.start()
+        self._future = submit(self._ble_communication_loop())
+        self._future.add_done_callback(self._on_loop_done)
 
     def get_data(self):
         """
         메인 스레드에서 가장 최근의 '보정된' 센서 데이터를 가져갑니다.
-        :return: {"timestamp": ..., "yaw": ..., "pitch": ..., "roll": ...}
+        :return: {"timestamp": ..., "yaw": ..., "pitch": ..., "roll": ...} (읽기 전용, 수정 금지)
         """
-        with self.data_lock:
-            return self.latest_data.copy()
+        # 수신 콜백이 매번 새 dict로 참조를 교체하므로 참조 읽기만으로 충분
+        return self.latest_data
 
     def stop(self):
         print("[IMU] 종료 신호 수신.")
         self.running = False
+        # 대기 중인 통신 작업을 취소 (async with가 BLE 연결을 정리함)
+        if self._future is not None:
+            self._future.cancel()
 
     # -----------------------------------------------------------------
     # --- 🚀 외부 요청을 처리하는 보정용 메서드 (신규 추가) ---
@@ -159,6 +235,7 @@ class GpsImuSensor:
             # 현재 센서의 원본 값(raw_yaw)을 기준으로,
             # 이 값을 0으로 만들기 위한 offset을 계산합니다.
             self.yaw_offset = -self.raw_yaw
+            self._yaw_bias = self.yaw_offset + 180.0
         print(f"[IMU] Yaw 'Tared' (영점 설정). "
               f"Raw: {self.raw_yaw:.2f}, New Offset: {self.yaw_offset:.2f}")
 
@@ -175,6 +252,7 @@ class GpsImuSensor:
             
             # offset 값도 -180 ~ +180 사이로 정규화
             self.yaw_offset = (offset + 180) % 360 - 180
+            self._yaw_bias = self.yaw_offset + 180.0
             
         print(f"[IMU] Yaw 'Aligned' (강제 정렬). "
               f"Set to: {true_heading:.2f}, Raw: {self.raw_yaw:.2f}, New Offset: {self.yaw_offset:.2f}")
@@ -6,9 +6,18 @@ RPLIDAR C1 센서의 하드웨어 연결 및 데이터 수신을 전담하는 
 
 import threading
 import time
+import array
+import operator
+import numpy as np
 from pyrplidar import PyRPlidar
 import config  # 프로젝트의 메인 설정 파일 임포트
 
+# 한 번의 스캔에서 저장할 최대 측정점 수 (express_4k, 10Hz 기준 약 400점)
+MAX_SCAN_POINTS = 720
+
+# 측정값 객체에서 (angle, distance)를 한 번의 C 호출로 꺼냄
+_angle_distance = operator.attrgetter('angle', 'distance')
+
 class LidarSensor(threading.Thread):
     """
     RPLIDAR 센서를 별도 스레드에서 실행하여 360도 스캔 데이터를 지속적으로 수신합니다.
@@ -22,7 +31,19 @@ class LidarSensor(threading.Thread):
         self.daemon = True  # 메인 프로그램 종료 시 이 스레드도 함께 종료
 
         self.lidar = PyRPlidar()
-        self.latest_scan = []  # 가장 최근의 [(angle, distance), ...] 스캔 데이터
+
+        # 스캔 데이터는 (각도 배열, 거리 배열) 두 개의 float32 버퍼에 저장 (SoA 구조)
+        # 스캔 스레드는 back 버퍼를 채운 뒤 front와 교체하여 공개합니다. (스캔마다 새 리스트/튜플을 만들지 않음)
+        # (측정점 단위 기록은 numpy 원소 대입보다 가벼운 array.array('f')에 하고,
+        #  get_data에서 numpy 배열로 한 번에 복사합니다.)
+        self._back = (array.array('f', bytes(4 * MAX_SCAN_POINTS)),
+                      array.array('f', bytes(4 * MAX_SCAN_POINTS)))
+        self._front = (array.array('f', bytes(4 * MAX_SCAN_POINTS)),
+                       array.array('f', bytes(4 * MAX_SCAN_POINTS)))
+        self._front_n = 0  # front 버퍼의 유효 측정점 수
+        self.scan_seq = 0  # front 버퍼가 바뀔 때마다 1씩 증가 (새 스캔 여부 판단용)
+        # front/back 교체와 메인 스레드의 front 읽기를 직렬화하는 락
+        self._buf_lock = threading.Lock()
         self.running = True    # 스레드 실행/종료를 제어하는 플래그
         self.logger = logger
         self.is_connected = False # 라이다 연결 상태 플래그
@@ -50,8 +71,8 @@ class LidarSensor(threading.Thread):
                 if not self.running:
                     break  # stop() 메서드가 호출되면 루프 탈출
                 
-                # 수신된 측정값(measurement) 리스트를 (각도, 거리) 튜플 리스트로 변환
-                self.latest_scan = [(m.angle, m.distance) for m in scan_data]
+                # 수신된 측정값(measurement)을 각도/거리 버퍼에 채운 뒤 공개
+                self._store_scan(scan_data)
                 
                 # (로깅) 라이다 데이터는 양이 많으므로 필요시 요약 정보만 로깅
                 # if self.logger:
@@ -59,7 +80,9 @@ class LidarSensor(threading.Thread):
 
         except Exception as e:
             print(f"[Lidar] 치명적 에러: 라이다 스레드 실행 중 예외 발생: {e}")
-            self.latest_scan = [] # 에러 발생 시 데이터 초기화
+            with self._buf_lock:
+                self._front_n = 0 # 에러 발생 시 데이터 초기화
+                self.scan_seq += 1
             self.is_connected = False
 
         finally:
@@ -71,12 +94,33 @@ class LidarSensor(threading.Thread):
                 self.lidar.disconnect()
             print("[Lidar] 라이다 스레드 종료 완료.")
 
+    def _store_scan(self, scan_data):
+        """스캔 측정값을 back 버퍼에 기록하고 front 버퍼와 교체합니다."""
+        angles, dists = self._back
+        get_ad = _angle_distance
+        n = 0
+        for m in scan_data:
+            if n >= MAX_SCAN_POINTS:
+                break  # 버퍼 용량 초과분은 버림
+            angles[n], dists[n] = get_ad(m)
+            n += 1
+        # 교체(포인터 swap)만 락 안에서 수행하여 O(1)로 공개
+        with self._buf_lock:
+            self._front, self._back = self._back, self._front
+            self._front_n = n
+            self.scan_seq += 1
+
     def get_data(self):
         """
         메인 스레드에서 가장 최근의 스캔 데이터를 가져갈 때 사용하는 함수.
-        :return: (각도, 거리) 튜플의 리스트
+        :return: (각도 배열[deg], 거리 배열[mm]) 튜플 (float32 numpy 배열 복사본)
         """
-        return self.latest_scan
+        # 교체된 front는 다음 스캔에서 back으로 재사용되므로, 락을 잡은 채로 복사본을 만듭니다.
+        with self._buf_lock:
+            angles, dists = self._front
+            n = self._front_n
+            return (np.frombuffer(angles, dtype=np.float32, count=n).copy(),
+                    np.frombuffer(dists, dtype=np.float32, count=n).copy())
 
     def stop(self):
         """스레드를 안전하게 종료시키기 위해 호출하는 함수"""
@@ -99,9 +143,9 @@ if __name__ == '__main__':
         # 10초 동안 1초마다 데이터 포인트 개수 출력
         for i in range(10):
             time.sleep(1)
-            scan = lidar_sensor.get_data()
-            if scan:
-                print(f"[{i+1}/10초] 현재 스캔 포인트 개수: {len(scan)}, 첫 번째 포인트: {scan[0]}")
+            angles, dists = lidar_sensor.get_data()
+            if len(angles):
+                print(f"[{i+1}/10초] 현재 스캔 포인트 개수: {len(angles)}, 첫 번째 포인트: ({angles[0]:.2f}, {dists[0]:.1f})")
             else:
                 print(f"[{i+1}/10초] 스캔 데이터를 아직 받지 못했거나 에러 발생.")
 
@@ -1,10 +1,12 @@
 # input/manual_input.py
 import threading
-import time
 import sys
 import os
 import struct
 import array
+import re
+import ctypes
+import ctypes.util
 
 # 운영체제에 따라 필요한 라이브러리가 다를 수 있습니다.
 # 이 코드는 리눅스 환경을 기준으로 작성되었습니다.
@@ -26,6 +28,28 @@ THROTTLE_AXIS_NAME = 'y'  # 스로틀(전/후진)에 사용할 조이스틱 축
 STEER_AXIS_NAME = 'rx'    # 조향(좌/우)에 사용할 조이스틱 축 이름
 DEADZONE = 0.08           # 조이스틱의 민감도를 조절하기 위한 데드존
 
+# 조이스틱 이벤트 구조체 (struct js_event: 시간(ms), 값, 타입, 번호 = 8바이트)
+# 포맷 문자열을 매번 해석하지 않도록 미리 컴파일해 둠
+_JS_EVENT = struct.Struct('IhBB')
+_js_iter_unpack = _JS_EVENT.iter_unpack
+JS_EVENT_SIZE = _JS_EVENT.size
+JS_READ_BATCH = 64  # read() 1회에 최대 64개 이벤트를 한꺼번에 읽음
+
+# 입력이 없을 때 epoll 대기 최대 시간 (초). 종료는 self-pipe로 즉시 깨우므로 길게 잡아도 됨
+POLL_TIMEOUT = 0.5
+
+# 조이스틱 핫플러그 감지용 inotify 설정 (linux/inotify.h)
+# 주기적으로 /dev/input을 다시 스캔하지 않고, 장치 노드가 생길 때만 커널이 알려줌
+INPUT_DEV_DIR = '/dev/input'
+IN_ATTRIB = 0x00000004   # 권한 변경 (udev가 노드 생성 직후 권한을 설정함)
+IN_CREATE = 0x00000100   # 파일(장치 노드) 생성
+_INOTIFY_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len (+ 이름 len바이트)
+_JS_NAME = re.compile(rb'js[0-9]+')
+
+# 조이스틱 ioctl 요청 코드 (linux/joystick.h)
+JSIOCGAXES = 0x80016a11   # 축 개수 (1바이트)
+JSIOCGAXMAP = 0x80406a32  # 축 매핑 (ABS_CNT = 0x40 바이트)
+
 # 조이스틱 이벤트 타입
 JS_EVENT_BUTTON = 0x01
 JS_EVENT_AXIS = 0x02
@@ -41,9 +65,39 @@ BUTTON_NAMES = {
     0x130: 'a', 0x131: 'b', 0x133: 'x', 0x134: 'y',
 }
 
+# 제어 값 튜플 (throttle, steering)의 인덱스
+CTRL_THROTTLE = 0
+CTRL_STEERING = 1
+
+# 키 입력 바이트열 -> (변경할 제어 값 인덱스, 값) 테이블
+# (화살표 키는 3바이트 ESC 시퀀스, 나머지는 1바이트 키)
+KEY_ACTIONS = {
+    b'\x1b[A': (CTRL_THROTTLE, 1.0),   # 전진
+    b'\x1b[B': (CTRL_THROTTLE, -1.0),  # 후진
+    b'\x1b[D': (CTRL_STEERING, -1.0),  # 좌회전
+    b'\x1b[C': (CTRL_STEERING, 1.0),   # 우회전
+    # 정지 키
+    b's': (CTRL_THROTTLE, 0.0), b'S': (CTRL_THROTTLE, 0.0), b' ': (CTRL_THROTTLE, 0.0),
+    # 조향 초기화 키
+    b'a': (CTRL_STEERING, 0.0), b'A': (CTRL_STEERING, 0.0),
+    b'd': (CTRL_STEERING, 0.0), b'D': (CTRL_STEERING, 0.0),
+}
+ESC_SEQ_LEN = 3      # '\x1b' + '[' + 문자
+ESC_SEQ_PREFIX = b'\x1b['
+KEY_READ_SIZE = 8    # read() 1회에 읽을 최대 바이트 수
+
+# int16 축 값(65536가지) -> 정규화 값 변환 테이블 (인덱스 = 값 & 0xFFFF)
+# int16 최솟값(-32768)만 -1.0을 살짝 벗어나므로 하한만 제한
+_AXIS_LUT = array.array('d', [
+    max(-1.0, (v if v < 0x8000 else v - 0x10000) / 32767.0) for v in range(0x10000)
+])
+
 def norm_axis(value):
-    """조이스틱 축 값을 -1.0 ~ 1.0 범위로 정규화합니다."""
-    return value / 32767.0
+    """
+    조이스틱 축 값을 -1.0 ~ 1.0 범위로 정규화합니다.
+    (범위 보장은 여기서 한 번만 수행하며, 이후 단계에서 다시 clamp할 필요가 없습니다.)
+    """
+    return _AXIS_LUT[value & 0xFFFF]
 
 def apply_deadzone(value, deadzone=DEADZONE):
     """데드존을 적용하여 작은 움직임을 무시합니다."""
@@ -56,9 +110,11 @@ class ManualInput(threading.Thread):
         self.daemon = True
         self.running = True
 
-        # 제어 값을 저장할 변수
-        self.throttle = 0.0  # -1.0 (후진) ~ 1.0 (전진)
-        self.steering = 0.0  # -1.0 (좌) ~ 1.0 (우)
+        # 제어 값 (throttle, steering)
+        # throttle: -1.0 (후진) ~ 1.0 (전진), steering: -1.0 (좌) ~ 1.0 (우)
+        # 두 값을 하나의 튜플로 묶어 참조 대입 한 번으로 교체하므로,
+        # 다른 스레드에서 읽을 때 락 없이도 항상 같은 시점의 한 쌍을 얻음
+        self._ctrl = (0.0, 0.0)
 
         # --------------------------------------------------------
         # (!!!) 여기에 기존 코드의 '초기화' 부분을 붙여넣으세요.
@@ -66,9 +122,25 @@ class ManualInput(threading.Thread):
         self.joystick_connected = False
         self.keyboard_active = False
 
+        # 조이스틱/키보드 fd를 하나의 epoll에 등록하여, 입력이 준비된 장치만 읽음
+        self._epoll = None
+        self._js_fd = -1
+        self._kb_fd = -1
+        self._hp_fd = -1   # /dev/input 감시용 inotify fd (핫플러그)
+        # stop() 호출 시 epoll 대기를 즉시 깨우기 위한 self-pipe
+        self._wake_r = self._wake_w = None
+        # read() 경계에서 잘린 ESC 시퀀스 앞부분 (다음 read 결과 앞에 붙여 해석)
+        self._kb_tail = b''
+
         if IS_LINUX:
+            self._epoll = select.epoll()
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            os.set_blocking(self._wake_w, False)
+            self._epoll.register(self._wake_r, select.EPOLLIN)
             self._init_joystick()
             self._init_keyboard()
+            self._init_hotplug()
         else:
             print("[Input] 수동 조작을 위한 환경이 아니므로 스레드를 시작하지 않습니다.")
             self.running = False # 스레드 실행 방지
@@ -79,9 +151,9 @@ class ManualInput(threading.Thread):
         """조이스틱 장치를 찾아 초기화합니다."""
         dev_path = None
         try:
-            for fn in sorted(os.listdir('/dev/input')):
+            for fn in sorted(os.listdir(INPUT_DEV_DIR)):
                 if fn.startswith('js'):
-                    dev_path = f'/dev/input/{fn}'
+                    dev_path = f'{INPUT_DEV_DIR}/{fn}'
                     break
         except FileNotFoundError:
             print("[Input] 조이스틱 장치를 찾을 수 없습니다. (디렉토리 없음)")
@@ -92,23 +164,29 @@ class ManualInput(threading.Thread):
             return
 
         try:
-            self.jsdev = open(dev_path, 'rb', buffering=0)
+            # 처음부터 논블로킹으로 열어 fd가 블로킹 상태인 구간이 없도록 함
+            fd = os.open(dev_path, os.O_RDONLY | os.O_NONBLOCK)
+            self.jsdev = os.fdopen(fd, 'rb', buffering=0)
             
             # 축(axis) 정보 가져오기
-            buf = array.array('B', [0])
-            fcntl.ioctl(self.jsdev, 0x80016a11, buf) # JSIOCGAXES
+            # 두 ioctl이 하나의 버퍼를 재사용 (축 개수는 첫 바이트에 기록됨)
+            ioctl = fcntl.ioctl
+            buf = array.array('B', bytes(0x40))
+            ioctl(self.jsdev, JSIOCGAXES, buf)
             num_axes = buf[0]
-            self.axis_map = []
-            buf = array.array('B', [0] * 0x40)
-            fcntl.ioctl(self.jsdev, 0x80406a32, buf) # JSIOCGAXMAP
-            for axis_code in buf[:num_axes]:
-                self.axis_map.append(AXIS_NAMES.get(axis_code, 'unknown'))
-            
-            # 논블로킹 모드 설정
-            flags = fcntl.fcntl(self.jsdev, fcntl.F_GETFL)
-            fcntl.fcntl(self.jsdev, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            ioctl(self.jsdev, JSIOCGAXMAP, buf)
+            self.axis_map = [AXIS_NAMES.get(axis_code, 'unknown') for axis_code in buf[:num_axes]]
 
-            self.axis_states = {name: 0.0 for name in self.axis_map}
+            # 축 값은 축 번호로 바로 접근하는 배열에 저장 (이벤트마다 dict 해싱을 하지 않음)
+            # 마지막 칸은 항상 0.0인 예비 칸으로, 조작 축이 없는 조이스틱이면 그 칸을 가리킴
+            self._axis_vals = array.array('d', bytes(8 * (num_axes + 1)))
+            self._throttle_idx = self._axis_index(THROTTLE_AXIS_NAME, num_axes)
+            self._steer_idx = self._axis_index(STEER_AXIS_NAME, num_axes)
+            # 이벤트를 읽어 들일 재사용 버퍼 (read()마다 새 bytes 객체를 만들지 않음)
+            self._js_buf = bytearray(JS_EVENT_SIZE * JS_READ_BATCH)
+            self._js_mv = memoryview(self._js_buf)
+            self._epoll.register(fd, select.EPOLLIN)
+            self._js_fd = fd
             self.joystick_connected = True
             print(f"[Input] 조이스틱 '{dev_path}' 연결 성공!")
 
@@ -116,97 +194,227 @@ class ManualInput(threading.Thread):
             print(f"[Input] 조이스틱 초기화 실패: {e}. 키보드 입력을 사용합니다.")
             self.joystick_connected = False
 
+    def _axis_index(self, name, num_axes):
+        """축 이름에 해당하는 축 번호를 반환합니다. (없으면 예비 칸 번호 num_axes)"""
+        return self.axis_map.index(name) if name in self.axis_map else num_axes
+
+    def _init_hotplug(self):
+        """
+        /dev/input에 inotify 감시를 걸어 조이스틱이 나중에 연결되어도 바로 인식합니다.
+        (감시 fd도 같은 epoll에 등록하므로 장치가 생기지 않는 동안에는 깨어나지 않음)
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+            if libc.inotify_add_watch(fd, INPUT_DEV_DIR.encode(), IN_CREATE | IN_ATTRIB) < 0:
+                err = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(err, "inotify_add_watch 실패")
+        except (OSError, AttributeError) as e:
+            print(f"[Input] 조이스틱 핫플러그 감지 비활성화: {e}")
+            return
+        self._epoll.register(fd, select.EPOLLIN)
+        self._hp_fd = fd
+
+    def _poll_hotplug(self):
+        """inotify 이벤트를 읽고, 조이스틱 노드(jsN)가 생기면 조이스틱을 초기화합니다."""
+        try:
+            data = os.read(self._hp_fd, 4096)
+        except BlockingIOError:
+            return
+        found = False
+        unpack_from, hdr = _INOTIFY_EVENT.unpack_from, _INOTIFY_EVENT.size
+        i, n = 0, len(data)
+        while i < n:
+            _wd, _mask, _cookie, name_len = unpack_from(data, i)
+            name = data[i + hdr:i + hdr + name_len].rstrip(b'\0')
+            if _JS_NAME.fullmatch(name):
+                found = True
+            i += hdr + name_len
+        if not found or self.joystick_connected:
+            return
+
+        self._init_joystick()
+        # 조이스틱이 연결되면 키보드 입력은 더 이상 사용하지 않음
+        if self.joystick_connected and self._kb_fd >= 0:
+            self._epoll.unregister(self._kb_fd)
+            self._kb_fd = -1
+
+    def _drop_joystick(self, err):
+        """조이스틱 연결이 끊겼을 때 정리하고 키보드 입력으로 되돌립니다."""
+        print(f"[Input] 조이스틱 연결 끊김: {err}. 키보드 입력을 사용합니다.")
+        self._epoll.unregister(self._js_fd)
+        self.jsdev.close()
+        self._js_fd = -1
+        self.joystick_connected = False
+        self._ctrl = (0.0, 0.0)
+        if self.keyboard_active and self._kb_fd < 0:
+            self._kb_tail = b''
+            self._epoll.register(self._tty_fd, select.EPOLLIN | select.EPOLLET)
+            self._kb_fd = self._tty_fd
+
     def _init_keyboard(self):
         """키보드 입력을 위한 터미널 설정을 초기화합니다."""
         try:
             self._fd = sys.stdin.fileno()
             self._old_settings = termios.tcgetattr(self._fd)
+            # 읽기용 fd는 터미널을 따로 열어 논블로킹으로 사용
+            # (stdin에 O_NONBLOCK을 걸면 stdout/stderr와 공유하는 파일 디스크립션이 바뀌어,
+            #  출력 버퍼가 찼을 때 print()가 BlockingIOError를 낼 수 있음)
+            self._tty_fd = os.open(os.ttyname(self._fd), os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
             tty.setcbreak(self._fd)
+            # 키보드는 조이스틱이 없을 때만 사용하므로 그때만 epoll에 등록
+            # (읽지 않는 fd를 등록해 두면 epoll이 계속 깨어남)
+            # 엣지 트리거: 새 입력이 도착했을 때만 한 번 깨어나며, _poll_keyboard가 버퍼를 모두 비움
+            if not self.joystick_connected:
+                self._epoll.register(self._tty_fd, select.EPOLLIN | select.EPOLLET)
+                self._kb_fd = self._tty_fd
             self.keyboard_active = True
-        except (termios.error, AttributeError) as e:
+        except (termios.error, AttributeError, OSError) as e:
             print(f"[Input] 키보드 초기화 실패: {e}. 터미널 환경이 아닐 수 있습니다.")
             self.keyboard_active = False
 
     def run(self):
         """스레드가 시작되면 이 함수가 계속 반복 실행됩니다."""
         while self.running:
-            if self.joystick_connected:
-                self._poll_joystick()
-            elif self.keyboard_active:
-                self._poll_keyboard()
-
-            time.sleep(0.02) # 루프가 너무 빨리 돌지 않도록 약간의 대기시간 추가
+            # 입력이 들어오거나 stop()이 호출되면 즉시 깨어남
+            # (입력이 없으면 최대 POLL_TIMEOUT초 후 running 플래그 재확인)
+            # (핫플러그로 장치 fd가 바뀔 수 있으므로 매번 현재 fd와 비교)
+            for fd, _ in self._epoll.poll(POLL_TIMEOUT):
+                if fd == self._js_fd:
+                    self._poll_joystick()
+                elif fd == self._kb_fd:
+                    self._poll_keyboard()
+                elif fd == self._hp_fd:
+                    self._poll_hotplug()
         
         # --------------------------------------------------------
         # (!!!) 여기에 프로그램 종료 시 필요한 '정리' 코드를 넣으세요.
         # --------------------------------------------------------
         if self.keyboard_active:
             termios.tcsetattr(self._fd, termios.TCSADRAIN, self._old_settings)
+            os.close(self._tty_fd)
             print("[Input] 터미널 설정 복원 완료.")
         if self.joystick_connected:
             self.jsdev.close()
             print("[Input] 조이스틱 장치 연결 해제.")
+        if self._hp_fd >= 0:
+            os.close(self._hp_fd)
+            self._hp_fd = -1
+        if self._epoll is not None:
+            self._epoll.close()
+        if self._wake_r is not None:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = None
 
     def _poll_joystick(self):
         """조이스틱 입력을 읽어 throttle과 steering 값을 업데이트합니다."""
+        iter_unpack = _js_iter_unpack
+        readv = os.readv
+        fd, bufs, mv = self._js_fd, [self._js_buf], self._js_mv
+        vals, lut = self._axis_vals, _AXIS_LUT
+        n_axes = len(vals) - 1
         try:
             while True: # 버퍼에 쌓인 모든 이벤트를 처리
-                evbuf = self.jsdev.read(8)
-                if evbuf is not None:
-                    t_ms, value, etype, number = struct.unpack('IhBB', evbuf)
-
-                    if (etype & ~JS_EVENT_INIT) == JS_EVENT_AXIS:
-                        if number < len(self.axis_map):
-                            axis_name = self.axis_map[number]
-                            self.axis_states[axis_name] = norm_axis(value)
+                # 여러 이벤트를 한 번의 시스템 호출로 미리 할당한 버퍼에 직접 읽음
+                # (파일 객체의 IO 계층과 호출마다의 bytes 할당을 거치지 않음)
+                n = readv(fd, bufs)
+                if not n:
+                    break
+                # (커널은 항상 이벤트 단위(8바이트)로 반환하므로 n은 8의 배수)
+                for t_ms, value, etype, number in iter_unpack(mv[:n]):
+                    if (etype & ~JS_EVENT_INIT) == JS_EVENT_AXIS and number < n_axes:
+                        vals[number] = lut[value & 0xFFFF]  # norm_axis() 인라인
 
         except BlockingIOError:
             # 더 이상 읽을 이벤트가 없으면 예외 발생 (정상)
             pass
+        except OSError as e:
+            # 조이스틱이 뽑히면 ENODEV 발생 -> 키보드로 전환 후 재연결은 inotify가 감지
+            self._drop_joystick(e)
+            return
 
         # 상태값으로 throttle, steering 업데이트
-        # 참고: 조이스틱에 따라 축 값이 반대일 수 있습니다. 그럴 경우 부호를 바꾸세요 (예: -self.axis_states.get(...))
-        raw_throttle = self.axis_states.get(THROTTLE_AXIS_NAME, 0.0)
-        raw_steering = self.axis_states.get(STEER_AXIS_NAME, 0.0)
+        # 참고: 조이스틱에 따라 축 값이 반대일 수 있습니다. 그럴 경우 부호를 바꾸세요 (예: -vals[self._throttle_idx])
+        raw_throttle = vals[self._throttle_idx]
+        raw_steering = vals[self._steer_idx]
         
-        self.throttle = -apply_deadzone(raw_throttle) # 보통 y축은 위로 올리면 음수이므로 부호 반전
-        self.steering = apply_deadzone(raw_steering)
+        # 데드존 적용 (apply_deadzone() 인라인)
+        # 보통 y축은 위로 올리면 음수이므로 스로틀은 부호 반전
+        self._ctrl = (-raw_throttle if abs(raw_throttle) > DEADZONE else 0.0,
+                      raw_steering if abs(raw_steering) > DEADZONE else 0.0)
 
     def _poll_keyboard(self):
         """키보드 입력을 읽어 throttle과 steering 값을 업데이트합니다."""
-        # select를 사용하여 논블로킹으로 키 입력 확인
-        if select.select([sys.stdin], [], [], 0) == ([sys.stdin], [], []):
-            key = sys.stdin.read(1)
-            
-            # 화살표 키 입력 처리
-            if key == '\x1b':
-                key2 = sys.stdin.read(1)
-                key3 = sys.stdin.read(1)
-                if key2 == '[':
-                    if key3 == 'A': self.throttle = 1.0   # 전진
-                    elif key3 == 'B': self.throttle = -1.0 # 후진
-                    elif key3 == 'D': self.steering = -1.0 # 좌회전
-                    elif key3 == 'C': self.steering = 1.0  # 우회전
-            # 정지 키
-            elif key in ('s', 'S', ' '):
-                self.throttle = 0.0
-            # 조향 초기화 키
-            elif key in ('a', 'A', 'd', 'D'):
-                 self.steering = 0.0
+        # 대기 중인 키 입력을 한 번에 읽음 (ESC 시퀀스도 함께 도착하므로 추가 read 불필요)
+        # sys.stdin의 텍스트 버퍼 계층을 거치지 않고 fd에서 직접 읽습니다.
+        # (준비 여부는 run()의 epoll이 이미 확인했으며, 따로 연 터미널 fd가 논블로킹이므로 막히지 않음)
+        # 엣지 트리거로 등록되어 있으므로 남은 입력이 없을 때까지 모두 읽어야 다음 입력에서 다시 깨어남
+        read, fd = os.read, self._tty_fd
+        while True:
+            try:
+                data = read(fd, KEY_READ_SIZE)
+            except BlockingIOError:
+                return
+            if not data:
+                return  # EOF (터미널 종료)
+            self._apply_keys(data)
+
+    def _apply_keys(self, data):
+        """읽어 들인 키 입력 바이트열을 테이블에 따라 throttle/steering에 반영합니다."""
+        actions = KEY_ACTIONS
+        if self._kb_tail:
+            data = self._kb_tail + data
+        ctrl = list(self._ctrl)
+        i, n = 0, len(data)
+        while i < n:
+            # ESC로 시작하면 3바이트 시퀀스, 그 외에는 1바이트 키로 테이블 조회
+            if data[i] == 0x1b:
+                if n - i < ESC_SEQ_LEN and ESC_SEQ_PREFIX.startswith(data[i:i + 2]):
+                    # 시퀀스가 read() 경계에서 잘림: 꼬리 바이트('A' 등)를 단독 키로 해석하지 않도록
+                    # 남은 앞부분을 보관했다가 다음 입력과 이어서 해석
+                    break
+                step = ESC_SEQ_LEN if data[i + 1] == 0x5b else 1  # '[' 가 아니면 ESC 단독 입력
+            else:
+                step = 1
+            action = actions.get(data[i:i + step])
+            if action is not None:
+                ctrl[action[0]] = action[1]
+            i += step
+        self._kb_tail = data[i:]
+        self._ctrl = tuple(ctrl)  # 한 번에 교체하여 공개
+
+    @property
+    def throttle(self):
+        """현재 스로틀 값 (-1.0 ~ 1.0)"""
+        return self._ctrl[CTRL_THROTTLE]
+
+    @property
+    def steering(self):
+        """현재 조향 값 (-1.0 ~ 1.0)"""
+        return self._ctrl[CTRL_STEERING]
 
     def get_control(self):
         """main.py에서 현재 조작값을 가져가기 위해 호출하는 함수"""
         # 키보드 입력의 경우, 키를 떼면 값이 0으로 돌아가도록 수정
         # (조이스틱은 중앙으로 돌아오므로 이 로직이 필요 없음)
-        current_throttle, current_steering = self.throttle, self.steering
+        current_throttle, current_steering = self._ctrl  # 한 번만 읽어 일관된 쌍을 얻음
         
         # 키보드 모드일 때만 값을 초기화
         if not self.joystick_connected and self.keyboard_active:
-            self.throttle = 0.0
-            self.steering = 0.0
+            self._ctrl = (0.0, 0.0)
 
         return current_throttle, current_steering
 
     def stop(self):
         """프로그램 종료 시 main.py에서 호출하는 함수"""
         self.running = False
+        # epoll 대기 중인 run()을 즉시 깨움
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b'\0')
+            except OSError:
+                pass  # 파이프가 이미 가득 참 (깨우기 신호가 이미 대기 중)
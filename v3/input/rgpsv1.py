@@ -1,15 +1,42 @@
 # input/gps_sensor.py
 """
 U-blox ZED-F9R GPS 수신기의 데이터 수신을 전담하는 모듈입니다.
-pyubx2 라이브러리를 사용하며, 별도의 스레드에서 동작합니다.
+UBX 프레임을 직접 분리하고 NAV-PVT는 struct로 바로 해석하며, 별도의 스레드에서 동작합니다.
 """
 
 import threading
 import time
+import os
+import struct
+import collections
+import selectors
 import serial
-import pyubx2
 import config  # OAK-D 코드와 config를 공유한다고 가정
 
+# UBX 프레임: 동기 바이트(0xB5 0x62) + class(1) + id(1) + length(2, LE) + payload + 체크섬(2)
+_UBX_SYNC = b'\xb5\x62'
+_NAV_PVT_HEADER = struct.pack('<BBH', 0x01, 0x07, 92) # NAV-PVT: class 0x01, id 0x07, 92바이트
+_UBX_LENGTH = struct.Struct('<H')
+_UBX_MAX_PAYLOAD = 1024  # 이보다 긴 length는 잘못 잡힌 동기 바이트로 간주
+_RX_COMPACT_THRESHOLD = 4096  # 수신 버퍼 앞쪽의 처리 완료 구간이 이 크기를 넘으면 잘라냄
+_SELECT_TIMEOUT = 1.0  # 수신이 없을 때 대기 최대 시간 (초). 종료는 wake 파이프로 즉시 깨움
+
+# NAV-PVT payload에서 사용하는 필드만 추출 (u-blox 인터페이스 문서의 오프셋 기준)
+# fixType(20), numSV(23), lon(24), lat(28), hMSL(36), gSpeed(60), headMot(64), pDOP(76)
+_NAV_PVT = struct.Struct('<20xB2xBii4xi20xii8xH')
+
+# 해석된 NAV-PVT 메시지 (pyubx2 NAV-PVT와 같은 속성 이름/단위, 불변 객체이므로 참조만 넘겨도 안전)
+# lat/lon/headMot: deg, hMSL: mm, gSpeed: mm/s, pDOP: 배율 적용된 값
+NavPvt = collections.namedtuple('NavPvt', 'fixType numSV lat lon hMSL gSpeed headMot pDOP')
+
+def _ubx_checksum(msg):
+    """UBX 8비트 Fletcher 체크섬 (class부터 payload 끝까지)"""
+    ck_a = ck_b = 0
+    for b in msg:
+        ck_a += b
+        ck_b += ck_a
+    return ck_a & 0xFF, ck_b & 0xFF
+
 class GpsSensor(threading.Thread):
     """
     U-blox ZED-F9R GPS 수신기를 별도 스레드에서 실행하여
@@ -31,8 +58,20 @@ class GpsSensor(threading.Thread):
         self.logger = logger
         self.running = True
         
-        self.latest_nav_pvt = None  # 가장 최근의 파싱된 NAV-PVT 메시지
+        self.latest_nav_pvt = None  # 가장 최근의 파싱된 NAV-PVT 메시지 (NavPvt)
         self.stream = None
+
+        # 시리얼 수신 누적 버퍼와 아직 처리하지 않은 첫 바이트 위치
+        # (NAV-PVT가 아닌 메시지는 객체를 만들지 않고 위치만 옮겨 건너뜀)
+        self._rx = bytearray()
+        self._rx_pos = 0
+
+        # 시리얼 fd와 stop()용 wake 파이프를 함께 감시 (데이터가 있거나 종료 요청 시에만 깨어남)
+        # 파이프는 run()에서 만들고 닫음 (시작하지 않은 스레드가 fd를 남기지 않도록)
+        # stop()의 쓰기와 run()의 정리가 겹치지 않도록 _wake_lock으로 보호
+        self._sel = None
+        self._wake_r = self._wake_w = None
+        self._wake_lock = threading.Lock()
         
         print(f"[GPS] ZED-F9R 스레드 초기화 완료 (Port: {port}, Baud: {baudrate})")
 
@@ -40,27 +79,38 @@ class GpsSensor(threading.Thread):
         """스레드가 시작될 때 실행되는 메인 루프"""
         
         try:
+            wake_r, wake_w = os.pipe()
+            os.set_blocking(wake_r, False)
+            os.set_blocking(wake_w, False)
+            with self._wake_lock:
+                self._wake_r, self._wake_w = wake_r, wake_w
+
             # 시리얼 포트 연결
             with serial.Serial(self.port, self.baudrate, timeout=3.0) as ser:
                 print(f"[GPS] {self.port} 시리얼 포트 연결 성공.")
-                # pyubx2 리더기 생성
-                ubr = pyubx2.UBXReader(ser)
+                try:
+                    self._sel = selectors.DefaultSelector()
+                    self._sel.register(ser.fileno(), selectors.EVENT_READ)
+                    self._sel.register(self._wake_r, selectors.EVENT_READ)
+                except (AttributeError, OSError, ValueError):
+                    # fd를 감시할 수 없는 플랫폼(예: 윈도우)에서는 블로킹 read로 대기
+                    if self._sel is not None:
+                        self._sel.close()
+                    self._sel = None
+                unpack_from = _NAV_PVT.unpack_from
                 
                 while self.running:
-                    try:
-                        # UBX 메시지 읽기 및 파싱
-                        (raw_data, parsed_data) = ubr.read()
+                    # 우리는 NAV-PVT 메시지에만 관심이 있습니다.
+                    frame = self._read_nav_pvt_frame(ser)
+                    if frame is not None:
+                        # payload(프레임 6바이트 이후)에서 필요한 필드만 한 번에 해석
+                        fix_type, num_sv, lon, lat, h_msl, g_speed, head_mot, p_dop = unpack_from(frame, 6)
+                        parsed_data = NavPvt(fix_type, num_sv, lat * 1e-7, lon * 1e-7,
+                                             h_msl, g_speed, head_mot * 1e-5, p_dop * 0.01)
+                        self.latest_nav_pvt = parsed_data
                         
-                        if parsed_data is not None:
-                            # 우리는 NAV-PVT 메시지에만 관심이 있습니다.
-                            if parsed_data.identity == "NAV-PVT":
-                                self.latest_nav_pvt = parsed_data
-                                
-                                # 데이터 로깅 처리
-                                self._log_data(parsed_data)
-
-                    except (pyubx2.UBXStreamError, pyubx2.UBXParseError) as e:
-                        print(f"[GPS] 경고: UBX 메시지 파싱 오류: {e}")
+                        # 데이터 로깅 처리
+                        self._log_data(parsed_data)
                     
                     if not self.running:
                         break
@@ -72,8 +122,84 @@ class GpsSensor(threading.Thread):
             print(f"[GPS] 치명적 에러: GPS 스레드 실행 중 예외 발생: {e}")
             self.running = False
         finally:
+            if self._sel is not None:
+                self._sel.close()
+                self._sel = None
+            # 속성을 먼저 None으로 바꾼 뒤 닫음 (stop()이 닫힌/재사용된 fd에 쓰지 않도록)
+            with self._wake_lock:
+                wake_r, wake_w = self._wake_r, self._wake_w
+                self._wake_r = self._wake_w = None
+            if wake_r is not None:
+                os.close(wake_r)
+                os.close(wake_w)
             print("[GPS] GPS 스레드 종료 완료.")
 
+    def _read_nav_pvt_frame(self, ser):
+        """
+        시리얼 스트림에서 다음 NAV-PVT 프레임을 꺼냅니다.
+        수신된 바이트를 한 번에 읽어 누적 버퍼에 쌓고, 동기 바이트/class/id/length만 보고
+        NAV-PVT가 아닌 메시지(NMEA 포함)는 읽기 위치만 옮겨 건너뜁니다.
+        :param ser: 열린 serial.Serial 객체
+        :return: 동기 바이트부터 체크섬까지의 NAV-PVT 프레임 bytes, 타임아웃/체크섬 오류 시 None
+        """
+        buf = self._rx
+        p = self._rx_pos
+        try:
+            while True:
+                start = buf.find(_UBX_SYNC, p)
+                if start < 0:
+                    # 동기 바이트 없음: 마지막 1바이트(0xB5일 수 있음)만 남기고 건너뜀
+                    p = max(p, len(buf) - 1)
+                else:
+                    p = start
+                    if len(buf) - p >= 6:
+                        length = _UBX_LENGTH.unpack_from(buf, p + 4)[0]
+                        if length > _UBX_MAX_PAYLOAD:
+                            p += 2 # 잘못된 동기 바이트 -> 다음 위치부터 다시 탐색
+                            continue
+                        total = length + 8 # 동기(2) + 헤더(4) + payload + 체크섬(2)
+                        if len(buf) - p >= total:
+                            end = p + total
+                            if buf[p + 2:p + 6] != _NAV_PVT_HEADER:
+                                p = end # 관심 없는 메시지는 통째로 건너뜀
+                                continue
+                            ck = _ubx_checksum(memoryview(buf)[p + 2:end - 2])
+                            if ck != (buf[end - 2], buf[end - 1]):
+                                print("[GPS] 경고: UBX 체크섬 불일치, 프레임 무시")
+                                p += 2
+                                return None
+                            frame = bytes(buf[p:end])
+                            p = end
+                            return frame
+
+                # 다 처리했거나 처리 완료 구간이 커졌으면 잘라낸 뒤,
+                # 수신된 만큼 한 번에 읽음 (없으면 데이터 도착 또는 stop() 호출까지 대기)
+                if p and (p >= len(buf) or p > _RX_COMPACT_THRESHOLD):
+                    del buf[:p]
+                    p = 0
+                if self._sel is not None and not self._wait_readable():
+                    return None # 시간 초과 또는 종료 요청
+                chunk = ser.read(ser.in_waiting or 1)
+                if not chunk:
+                    return None # 타임아웃
+                buf += chunk
+        finally:
+            self._rx_pos = p
+
+    def _wait_readable(self):
+        """
+        시리얼 포트에 읽을 데이터가 생길 때까지 대기합니다.
+        :return: 읽을 데이터가 있으면 True, 시간 초과 또는 stop() 호출 시 False
+        """
+        for key, _ in self._sel.select(_SELECT_TIMEOUT):
+            if key.fd == self._wake_r:
+                try:
+                    os.read(self._wake_r, 64) # 깨우기 신호 비우기
+                except BlockingIOError:
+                    pass
+                return False
+        return self.running
+
     def _log_data(self, data):
         """설정된 주기에 맞춰 GPS 데이터를 로깅합니다."""
         if not self.logger:
@@ -82,7 +208,7 @@ class GpsSensor(threading.Thread):
         now = time.time()
         
         # NAV-PVT의 핵심 정보만 추출하여 로깅
-        # (pyubx2는 data.lat, data.lon 등으로 속성에 바로 접근하게 해줍니다)
+        # (NavPvt는 pyubx2와 같은 이름의 속성으로 바로 접근할 수 있습니다)
         self.logger.log_data({
             'timestamp': now,
             'type': 'gps_nav_pvt',
@@ -99,7 +225,7 @@ class GpsSensor(threading.Thread):
     def get_data(self):
         """
         메인 스레드에서 가장 최근의 파싱된 NAV-PVT 데이터를 가져갈 때 사용하는 함수.
-        :return: pyubx2.UBXMessage 객체 (NAV-PVT) 또는 None
+        :return: NavPvt 객체 (pyubx2 NAV-PVT와 같은 속성) 또는 None
         """
         return self.latest_nav_pvt
 
@@ -107,6 +233,13 @@ class GpsSensor(threading.Thread):
         """스레드를 안전하게 종료시키기 위해 호출하는 함수"""
         print("[GPS] 종료 신호 수신.")
         self.running = False
+        # 수신 대기 중인 스레드를 즉시 깨움
+        with self._wake_lock:
+            if self._wake_w is not None:
+                try:
+                    os.write(self._wake_w, b'\0')
+                except OSError:
+                    pass # 파이프가 이미 가득 참 (깨우기 신호가 이미 대기 중)
 
 # -----------------------------------------------
 # (참고) 이 파일 단독으로 GPS 센서만 테스트할 때 사용
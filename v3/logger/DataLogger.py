@@ -9,6 +9,8 @@ import queue
 import csv
 import os
 import time
+import operator
+import atexit
 import config
 
 class DataLogger(threading.Thread):
@@ -20,8 +22,11 @@ class DataLogger(threading.Thread):
         self.daemon = True
         self.running = True
         
-        # 스레드 간 안전한 데이터 교환을 위한 큐(Queue)
-        self.data_queue = queue.Queue()
+        # 스레드 간 안전한 데이터 교환을 위한 큐(Queue) (크기 제한)
+        self.data_queue = queue.Queue(maxsize=config.LOG_QUEUE_MAX)
+        # 큐가 가득 차서 버려진 기록 수 (로깅 스레드가 1초마다 확인하여 기록)
+        self.dropped = 0
+        self.csv_file = None
 
         # --- 로그 파일 및 디렉토리 준비 ---
         try:
@@ -35,12 +40,20 @@ class DataLogger(threading.Thread):
 
             # CSV 로그 파일 열기 (이어쓰기가 아닌, 실행 시마다 새로 생성 'w')
             # (!!!) 기존 로그를 보존하려면 'w'를 'a'(append)로 변경
-            self.csv_file = open(config.LOG_CSV_FILE_PATH, 'w', newline='', encoding='utf-8')
+            # 큰 버퍼로 열어 기록을 메모리에 모았다가 flush 간격마다 한 번에 씀
+            self.csv_file = open(config.LOG_CSV_FILE_PATH, 'w', newline='', encoding='utf-8',
+                                 buffering=config.LOG_WRITE_BUFFER_BYTES)
             
-            # CSV 작성을 위한 DictWriter 준비 (헤더는 첫 데이터 수신 후 동적 결정)
-            self.csv_writer = None
+            # CSV 작성을 위한 writer 준비 (헤더는 첫 데이터 수신 후 동적 결정)
+            # 행은 헤더 순서로 정렬한 값 리스트로 기록 (DictWriter의 행마다 dict 재구성 비용 제거)
+            self.csv_writer = csv.writer(self.csv_file)
             self.csv_headers = []
+            self._header_set = set() # csv_headers 포함 여부 확인용 (행마다 set을 만들지 않음)
+            self._fast_headers = ()  # 행 값을 꺼낼 헤더 순서 (헤더가 바뀔 때만 갱신)
             
+            # stop()이 호출되지 않고 프로세스가 끝나도 버퍼에 남은 기록을 파일에 남김
+            atexit.register(self.stop)
+
             print(f"[Logger] 로거 초기화 완료. 로그 경로: '{config.LOG_BASE_DIR}/'")
 
         except Exception as e:
@@ -51,74 +64,186 @@ class DataLogger(threading.Thread):
         """
         다른 스레드(센서, 컨트롤러 등)에서 이 함수를 호출하여 로깅할 데이터를 큐에 추가합니다.
         :param data_dict: {'type': '...', 'timestamp': ..., 'key': value, ...} 형식의 딕셔너리
+        :return: 큐가 가득 차서 버려졌으면 False (호출한 스레드는 절대 블로킹되지 않음)
         """
         if self.running and config.LOG_ENABLE:
             try:
                 self.data_queue.put_nowait(data_dict)
             except queue.Full:
-                print("[Logger] 경고: 데이터 큐가 가득 찼습니다. 일부 로그가 유실될 수 있습니다.")
+                self.dropped += 1 # 출력은 로깅 스레드에서 1초에 한 번만
+                return False
+        return True
+
+    def log_batch(self, log_type, fields, rows):
+        """
+        고빈도 센서가 여러 샘플을 모아 한 번에 큐에 추가할 때 사용합니다. (큐 작업 1회)
+        :param log_type: 각 행에 붙일 'type' 값 (예: 'imu_data')
+        :param fields: 행 튜플의 각 위치에 해당하는 키 이름 튜플 (예: ('timestamp', 'yaw', ...))
+        :param rows: 값 튜플의 리스트 (호출 후 수정하지 말 것)
+        :return: 큐가 가득 차서 버려졌으면 False (호출한 스레드는 절대 블로킹되지 않음)
+        """
+        if rows and self.running and config.LOG_ENABLE:
+            try:
+                self.data_queue.put_nowait((log_type, fields, rows))
+            except queue.Full:
+                self.dropped += 1 # 출력은 로깅 스레드에서 1초에 한 번만
+                return False
+        return True
+
+    def _write_item(self, item):
+        """큐에서 꺼낸 항목(dict 또는 log_batch 묶음)을 CSV에 기록합니다."""
+        if isinstance(item, tuple):
+            self._write_batch(*item)
+        else:
+            self._write_row(item)
+
+    def _update_headers(self, keys):
+        """
+        기존에 없던 키(열)가 있으면 헤더에 추가합니다. (스키마가 바뀔 때만 실행되는 느린 경로)
+        :param keys: 기록할 데이터의 키 목록 (순서 유지)
+        """
+        # 기존 헤더에 새로운 키 추가
+        self.csv_headers.extend([k for k in keys if k not in self._header_set])
+        self._header_set = set(self.csv_headers)
+        self._fast_headers = tuple(self.csv_headers)
+
+        # 파일의 맨 처음이라면 헤더 쓰기
+        if self.csv_file.tell() == 0:
+            self.csv_writer.writerow(self._fast_headers)
+
+    def _write_row(self, data):
+        """딕셔너리 한 개를 CSV 한 줄로 기록합니다. (필요시 헤더 갱신)"""
+        # --- CSV 헤더 처리 ---
+        # 첫 데이터이거나, 기존에 없던 새로운 키(열)가 포함된 데이터가 들어오면 헤더 업데이트
+        # (스키마가 안정된 뒤에는 keys 뷰 <= set 비교만 수행)
+        if not data.keys() <= self._header_set:
+            self._update_headers(data.keys())
+
+        # --- 데이터 쓰기 ---
+        # 헤더 순서대로 값을 꺼내 기록 (없는 열은 빈 칸)
+        get = data.get
+        self.csv_writer.writerow([get(h, '') for h in self._fast_headers])
+
+    def _write_batch(self, log_type, fields, rows):
+        """log_batch 묶음을 행마다 dict를 만들지 않고 한 번에 기록합니다."""
+        keys = ('type',) + tuple(fields)
+        if not self._header_set.issuperset(keys):
+            self._update_headers(keys)
+
+        # 헤더 순서 -> (값 튜플 + (type, 빈 칸))의 위치 매핑을 묶음마다 한 번만 계산
+        # (헤더에는 항상 'type'과 필드가 모두 있으므로 itemgetter는 튜플을 반환)
+        n = len(fields)
+        pos = dict(zip(fields, range(n)))
+        pos['type'] = n
+        pick = operator.itemgetter(*[pos.get(h, n + 1) for h in self._fast_headers])
+        tail = (log_type, '')
+        self.csv_writer.writerows([pick(row + tail) for row in rows])
 
     def run(self):
         """스레드가 시작되면 실행되는 메인 로깅 루프"""
         print("[Logger] 데이터 로깅 스레드 시작.")
-        
-        while self.running:
+
+        if self.csv_file is None:
+            return # 초기화 실패 (기록할 파일 없음)
+
+        get = self.data_queue.get
+        get_nowait = self.data_queue.get_nowait
+        flush_interval = config.LOG_FLUSH_INTERVAL_S
+        last_flush = time.monotonic()
+        pending = False  # flush되지 않은 기록이 있는지 여부
+        next_stats = last_flush + 1.0
+        reported_drops = 0
+        finished = False  # 종료 신호(None)를 받았는지 여부
+
+        while not finished:
             try:
-                # 큐에서 데이터가 들어올 때까지 최대 1초 대기
-                data = self.data_queue.get(timeout=1.0)
-                
-                # --- CSV 헤더 처리 ---
-                # 첫 데이터이거나, 기존에 없던 새로운 키(열)가 포함된 데이터가 들어오면 헤더 업데이트
-                if self.csv_writer is None or not set(data.keys()).issubset(self.csv_headers):
-                    # 기존 헤더에 새로운 키 추가
-                    self.csv_headers.extend([k for k in data.keys() if k not in self.csv_headers])
-                    
-                    # DictWriter를 새로운 헤더로 다시 생성
-                    self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=self.csv_headers)
-                    
-                    # 파일의 맨 처음이라면 헤더 쓰기
-                    if self.csv_file.tell() == 0:
-                        self.csv_writer.writeheader()
-
-                # --- 데이터 쓰기 ---
-                # 헤더에 정의된 필드만 골라서 CSV 파일에 한 줄 기록
-                self.csv_writer.writerow({k: v for k, v in data.items() if k in self.csv_headers})
-                
-                # (중요) 버퍼를 비워 파일에 즉시 쓰도록 함 (실시간 확인용)
-                self.csv_file.flush()
-                
+                # 큐에서 데이터가 들어올 때까지 대기
+                # (flush 대기 중인 기록이나 보고할 유실 통계가 있을 때만 시간 제한을 둠)
+                if pending:
+                    timeout = flush_interval
+                elif self.dropped != reported_drops:
+                    timeout = 1.0
+                else:
+                    timeout = None
+                data = get(timeout=timeout)
+
+                # 그 사이 쌓인 항목을 한 번에 모두 기록
+                while data is not None:
+                    try:
+                        self._write_item(data)
+                    except Exception as e:
+                        print(f"[Logger] 에러: 로깅 루프 중 예외 발생: {e}")
+                    pending = True
+                    try:
+                        data = get_nowait()
+                    except queue.Empty:
+                        break
+                else:
+                    # 종료 신호: 이 앞에 들어온 기록은 모두 위에서 처리됨
+                    finished = True
+
             except queue.Empty:
-                # 1초 동안 큐에 데이터가 없으면 그냥 계속 진행
-                # (프로그램 종료를 위해 필요)
-                continue
-            except Exception as e:
-                print(f"[Logger] 에러: 로깅 루프 중 예외 발생: {e}")
+                # 시간 제한 동안 데이터가 없으면 아래의 flush/통계 처리로 진행
+                pass
+
+            # 1초마다 (그리고 종료 직전에) 새로 버려진 기록이 있으면 통계 행을 남김
+            now = time.monotonic()
+            if now >= next_stats or finished:
+                next_stats = now + 1.0
+                dropped = self.dropped
+                if dropped != reported_drops:
+                    print(f"[Logger] 경고: 데이터 큐가 가득 차 지금까지 {dropped}개의 로그가 유실되었습니다.")
+                    try:
+                        self._write_row({'type': 'logger_stats', 'timestamp': time.time(), 'dropped': dropped})
+                        pending = True
+                    except Exception as e:
+                        print(f"[Logger] 에러: 통계 기록 실패: {e}")
+                    reported_drops = dropped
+
+            # 버퍼를 파일에 쓰는 것은 최대 flush_interval마다 한 번 (실시간 확인용)
+            if pending and time.monotonic() - last_flush >= flush_interval:
+                try:
+                    self.csv_file.flush()
+                except Exception as e:
+                    print(f"[Logger] 에러: 로그 파일 flush 실패: {e}")
+                last_flush = time.monotonic()
+                pending = False
 
         # --- 스레드 종료 처리 ---
-        self.stop()
+        self._close_file()
         print("[Logger] 데이터 로깅 스레드 종료 완료.")
 
+    def _close_file(self):
+        """로그 파일을 닫습니다. (남은 버퍼는 close()에서 기록됨)"""
+        if self.csv_file:
+            self.csv_file.close()
+            self.csv_file = None
+            print("[Logger] 로그 파일 닫기 완료.")
+
     def stop(self):
         """스레드를 안전하게 종료시키기 위해 호출하는 함수"""
         if not self.running:
             return # 이미 종료된 경우 중복 실행 방지
             
         print("[Logger] 종료 신호 수신. 남은 데이터를 처리합니다...")
-        self.running = False
-        
-        # 큐에 남아있는 모든 데이터를 파일에 기록
-        while not self.data_queue.empty():
+        self.running = False # 이후의 log_data/log_batch는 무시됨
+
+        if self.is_alive():
+            # 큐 끝에 종료 신호(None)를 넣어, 로깅 스레드가 그 앞의 기록을 모두 쓴 뒤 종료하도록 함
+            # (empty()로 확인하면 아직 들어오는 중인 기록을 놓칠 수 있음)
+            self.data_queue.put(None)
+            self.join(timeout=5.0)
+            return
+
+        # 로깅 스레드가 실행 중이 아니면 여기서 직접 남은 데이터를 기록
+        while True:
             try:
                 data = self.data_queue.get_nowait()
-                if self.csv_writer:
-                    self.csv_writer.writerow({k: v for k, v in data.items() if k in self.csv_headers})
             except queue.Empty:
                 break
+            try:
+                if self.csv_file:
+                    self._write_item(data)
             except Exception as e:
                 print(f"[Logger] 종료 중 로깅 에러: {e}")
-
-        # 파일 닫기
-        if self.csv_file:
-            self.csv_file.close()
-            self.csv_file = None
-            print("[Logger] 로그 파일 닫기 완료.")
+        self._close_file()
@@ -7,6 +7,8 @@ UGV(무인 차량) 시스템의 메인 실행 파일입니다.
 """
 
 import time
+import queue
+import threading
 import cv2  # OpenCV (디버깅용 영상 표시에 사용)
 import config  # 설정 파일 임포트
 
@@ -17,6 +19,62 @@ from input.manual_input import ManualInput
 from board.actuators import ActuatorControl
 from control.logic_controller import LogicController
 
+class DisplayThread(threading.Thread):
+    """
+    (디버깅) 카메라 영상 출력을 전담하는 스레드입니다.
+    컬러맵 변환, imshow, waitKey는 수~수십 ms가 걸리므로 제어 루프에서 분리하고,
+    메인 루프는 1칸짜리 큐에 최신 프레임만 넣습니다. (큐가 차 있으면 해당 프레임은 버림)
+    OpenCV 창 관련 호출은 모두 이 스레드 안에서만 수행합니다.
+    """
+    def __init__(self):
+        super().__init__(name="display", daemon=True)
+        self.frames = queue.Queue(maxsize=1)  # 최신 (RGB, Depth) 프레임 1개
+        self.quit_event = threading.Event()   # 'q' 키 입력 시 set (메인 루프에서 확인)
+        self.running = True
+
+    def submit(self, rgb_frame, depth_frame):
+        """
+        표시할 프레임을 넘깁니다. (non-blocking, 이전 프레임이 아직 처리 중이면 버림)
+        :param rgb_frame: RGB 프레임 (없으면 None)
+        :param depth_frame: Depth 프레임 (없으면 None)
+        """
+        try:
+            self.frames.put_nowait((rgb_frame, depth_frame))
+        except queue.Full:
+            pass
+
+    def run(self):
+        while self.running:
+            try:
+                rgb_frame, depth_frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                # 새 프레임이 없어도 창 이벤트(키 입력 등)는 계속 처리
+                rgb_frame = depth_frame = None
+
+            if rgb_frame is not None:
+                # (필요시 controller.mode 같은 텍스트 추가)
+                # cv2.putText(rgb_frame, f"Mode: {controller.mode}", ...)
+                cv2.imshow("RGB Camera Feed", rgb_frame)
+
+            if depth_frame is not None:
+                depth_color = cv2.applyColorMap(
+                    cv2.convertScaleAbs(depth_frame, alpha=0.03), 
+                    cv2.COLORMAP_JET
+                )
+                cv2.imshow("Depth Feed", depth_color)
+
+            # 'q' 키를 누르면 메인 루프에 종료 요청 (OpenCV 창이 활성화되어 있어야 함)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                self.quit_event.set()
+
+        # OpenCV 창 닫기 (창을 만든 이 스레드에서 수행)
+        cv2.destroyAllWindows()
+
+    def stop(self):
+        """스레드를 종료하고 창이 닫힐 때까지 잠시 기다립니다."""
+        self.running = False
+        self.join(timeout=1.0)
+
 def main():
     """메인 실행 함수"""
     print("===================================")
@@ -99,18 +157,34 @@ def main():
     # -----------------------------------------------
     print("\n[Main] 메인 제어 루프를 시작합니다. (터미널 'q' 또는 Ctrl+C로 종료)")
     
+    # (디버깅) 영상 출력 스레드
+    display = DisplayThread()
+    display.start()
+    quit_event = display.quit_event
+    last_frame_seq = -1  # 마지막으로 표시 스레드에 넘긴 카메라 프레임 번호
+    last_scan_seq = -1   # 마지막으로 가져온 라이다 스캔 번호
+    lidar_data = None
+    
     # 루프 주기 계산
     loop_interval = 1.0 / config.MAIN_LOOP_HZ
     
     try:
+        # 다음 주기 시작 시각 (시스템 시계 변경에 영향받지 않는 monotonic 기준)
+        # 매 주기 '남은 시간'이 아닌 절대 마감 시각에 맞춰 대기하므로 주기가 누적 지연(drift)되지 않음
+        next_deadline = time.monotonic()
         while True:
-            loop_start_time = time.time()
+            loop_start_time = time.monotonic()
 
             # --- [흐름 1: Input] 모든 입력값 가져오기 ---
             # (각 스레드에서 최신 데이터를 non-blocking으로 가져옴)
             throttle_in, steering_in = manual_input.get_control()
-            lidar_data = lidar.get_data()
+            # 라이다는 새 스캔이 공개됐을 때만 복사해 옴 (같은 스캔이면 이전 튜플을 그대로 전달)
+            scan_seq = lidar.scan_seq  # (데이터보다 먼저 읽어야 새 스캔을 놓치지 않음)
+            if scan_seq != last_scan_seq:
+                last_scan_seq = scan_seq
+                lidar_data = lidar.get_data()
             gps_data = gps_imu.get_data()
+            frame_seq = camera.frame_seq  # (프레임보다 먼저 읽어야 새 프레임을 놓치지 않음)
             rgb_frame, depth_frame = camera.get_data()
 
             # --- [흐름 2: Control] 로직 컨트롤러에 데이터 전달 ---
@@ -124,35 +198,31 @@ def main():
 
             # --- [흐름 4: 디버깅] (선택 사항) ---
             
-            # (디버깅) 카메라 영상 출력
-            if rgb_frame is not None:
-                # (필요시 controller.mode 같은 텍스트 추가)
-                # cv2.putText(rgb_frame, f"Mode: {controller.mode}", ...)
-                cv2.imshow("RGB Camera Feed", rgb_frame)
-            
-            # (디버깅) 뎁스 영상 출력
-            if depth_frame is not None:
-                depth_color = cv2.applyColorMap(
-                    cv2.convertScaleAbs(depth_frame, alpha=0.03), 
-                    cv2.COLORMAP_JET
-                )
-                cv2.imshow("Depth Feed", depth_color)
+            # (디버깅) 카메라/뎁스 영상 출력은 표시 스레드에 넘김 (제어 루프를 막지 않음)
+            # 카메라가 새 프레임을 내놓았을 때만 넘겨서 같은 프레임을 반복 변환/표시하지 않음
+            if frame_seq != last_frame_seq:
+                last_frame_seq = frame_seq
+                display.submit(rgb_frame, depth_frame)
 
-            # 'q' 키를 누르면 루프 종료 (OpenCV 창이 활성화되어 있어야 함)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            # 표시 스레드에서 'q' 키 입력이 감지되면 루프 종료
+            if quit_event.is_set():
                 print("[Main] 'q' 키 입력. 시스템을 종료합니다.")
                 break
 
             # --- [흐름 5: 루프 주기 맞추기] ---
-            elapsed_time = time.time() - loop_start_time
-            sleep_time = loop_interval - elapsed_time
+            next_deadline += loop_interval
+            now = time.monotonic()
+            sleep_time = next_deadline - now
             
             if sleep_time > 0:
                 time.sleep(sleep_time)
             else:
                 # (주의) 루프가 설정된 주기(Hz)보다 느리게 실행되고 있음
+                elapsed_time = now - loop_start_time
                 print(f"[Main] 경고: 제어 루프가 느립니다! "
                       f"(소요: {elapsed_time:.4f}s > 목표: {loop_interval:.4f}s)")
+                # 밀린 주기를 몰아서 실행하지 않도록 마감 시각을 현재로 재설정
+                next_deadline = now
 
     except KeyboardInterrupt:
         # 터미널에서 Ctrl+C 입력 시
@@ -177,8 +247,8 @@ def main():
         gps_imu.stop()
         print("[Main] 모든 Input 스레드 정지 신호 전송.")
         
-        # OpenCV 창 닫기
-        cv2.destroyAllWindows()
+        # 영상 출력 스레드 정지 (창은 표시 스레드가 스스로 닫음)
+        display.stop()
         
         # 로거 스레드 정지 (파일 닫기)
         if logger:
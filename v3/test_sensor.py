@@ -2,6 +2,7 @@
 """센서들만 동시에 테스트하는 스크립트"""
 import time
 import cv2
+import numpy as np
 import config
 
 from input.lidar_sensor import LidarSensor
@@ -9,6 +10,19 @@ from input.depth_camera_sensor import DepthCameraSensor
 from input.gps_imu_sensor import GpsImuSensor
 from input.manual_input import ManualInput
 
+def build_depth_color_lut():
+    """
+    뎁스 값(uint16) -> 컬러(BGR) 변환 테이블을 만듭니다.
+    convertScaleAbs(alpha=0.03) + applyColorMap(JET) 두 단계를 표 한 번 조회로 대체합니다.
+    :return: (65536, 3) uint8 배열
+    """
+    # 1) 뎁스 값 -> 0~255 (convertScaleAbs와 같은 반올림/포화 처리)
+    scaled = np.clip(np.rint(np.arange(65536) * 0.03), 0, 255).astype(np.uint8)
+    # 2) 0~255 -> JET 컬러
+    jet = cv2.applyColorMap(np.arange(256, dtype=np.uint8).reshape(1, 256),
+                            cv2.COLORMAP_JET).reshape(256, 3)
+    return jet[scaled]
+
 def main():
     print("=" * 50)
     print(" 센서 동시 작동 테스트 시작")
@@ -42,35 +56,45 @@ def main():
     # 2. 메인 테스트 루프
     print("\n[Test] 센서 데이터 수신 중... (Ctrl+C로 종료)\n")
     
-    loop_count = 0
+    depth_lut = build_depth_color_lut()
+    depth_color = None  # 뎁스 컬러 영상 버퍼 (첫 프레임 크기에 맞춰 한 번만 할당)
+    # 마지막으로 화면에 표시한 RGB/Depth 프레임 번호 (바뀌지 않았으면 다시 그리지 않음)
+    last_rgb_ver = last_depth_ver = -1
+    next_report = time.monotonic() + 1.0
     try:
         while True:
-            loop_count += 1
+            # 새 카메라 프레임이 도착하면 바로 깨어나고, 없으면 최대 50ms 대기 (20Hz)
+            camera.wait_for_frame(0.05)
             
             # 모든 센서 데이터 가져오기
             throttle, steering = manual_input.get_control()
             lidar_data = lidar.get_data()
             gps_data = gps_imu.get_data()
+            rgb_ver, depth_ver = camera.rgb_version, camera.depth_version  # (프레임보다 먼저 읽음)
             rgb_frame, depth_frame = camera.get_data()
             
             # 1초마다 데이터 출력
-            if loop_count % 20 == 0:  # 20Hz 기준 1초
+            now = time.monotonic()
+            if now >= next_report:
+                next_report = now + 1.0
                 print(f"[{time.strftime('%H:%M:%S')}] 센서 상태:")
                 print(f"  - 수동 입력: throttle={throttle:.2f}, steering={steering:.2f}")
-                print(f"  - LiDAR: {len(lidar_data)} points")
+                print(f"  - LiDAR: {len(lidar_data[0])} points")
                 print(f"  - GPS/IMU: yaw={gps_data.get('yaw', 0):.1f}°, pitch={gps_data.get('pitch', 0):.1f}°")
                 print(f"  - 카메라: RGB={rgb_frame is not None}, Depth={depth_frame is not None}")
                 print()
             
-            # 카메라 영상 표시
-            if rgb_frame is not None:
+            # 카메라 영상 표시 (새 프레임일 때만)
+            if rgb_frame is not None and rgb_ver != last_rgb_ver:
+                last_rgb_ver = rgb_ver
                 cv2.imshow("RGB Camera", rgb_frame)
             
-            if depth_frame is not None:
-                depth_color = cv2.applyColorMap(
-                    cv2.convertScaleAbs(depth_frame, alpha=0.03),
-                    cv2.COLORMAP_JET
-                )
+            if depth_frame is not None and depth_ver != last_depth_ver:
+                last_depth_ver = depth_ver
+                # 뎁스 버퍼를 한 번만 읽어 바로 컬러 영상으로 변환 (중간 uint8 영상 없음)
+                if depth_color is None or depth_color.shape[:2] != depth_frame.shape:
+                    depth_color = np.empty(depth_frame.shape + (3,), dtype=np.uint8)
+                np.take(depth_lut, depth_frame, axis=0, out=depth_color)
                 cv2.imshow("Depth Camera", depth_color)
             
             # 'q' 키로 종료
@@ -78,8 +102,6 @@ def main():
                 print("[Test] 'q' 키 입력. 종료합니다.")
                 break
             
-            time.sleep(0.05)  # 20Hz
-            
     except KeyboardInterrupt:
         print("\n[Test] Ctrl+C 입력. 종료합니다.")
     